@@ -1,10 +1,13 @@
+import bpy
+import sys
+
 from . import(
-    maya_soft_select,
-    maya_vert_face,
+    lazy,
+    shaders,
+    mesh_stats,
     maya_from_object,
     maya_piemenu,
     camera,
-    material_panel,
     keycore
     )
 
@@ -21,17 +24,53 @@ bl_info = {
     "category": "Tool"
 }
 
+# 较重的模块在第一次使用时才导入，见 lazy.py
+# 导入子模块时 Python 会把它设为包的同名属性，所以这里不能与模块同名
+lazy_soft_select = lazy.LazyModule(
+    __name__, "maya_soft_select",
+    operators=[("view3d.maya_soft_selection", "Maya Soft Selection")],
+)
+
+lazy_vert_face = lazy.LazyModule(
+    __name__, "maya_vert_face",
+    operators=[("object.vertex_face_display", "顶点/面显示")],
+    # 饼菜单在模块加载前就会读取 vertex_face_display_enabled
+    scene_properties={
+        "vertex_face_display_enabled": bpy.props.BoolProperty(name="顶点/面显示启用", default=False),
+        "vertex_face_display_live": bpy.props.BoolProperty(
+            name="实时更新", description="网格编辑后自动刷新显示", default=True),
+        "vertex_face_display_lod": bpy.props.BoolProperty(
+            name="细节层级", description="按物体在屏幕上的大小减少密集网格上绘制的线框和顶点", default=True),
+        "vertex_face_display_max_verts": bpy.props.IntProperty(
+            name="常驻顶点上限", description="显示缓冲的顶点总数超过此值时，释放最久未在屏幕上出现的对象",
+            default=20000000, min=100000),
+    },
+)
+
+lazy_material_panel = lazy.LazyModule(
+    __name__, "material_panel",
+    panels=[
+        ("QUICK_SWORD_TEXTURE_PT_panel", "Quick Sword Texture", 'PROPERTIES', 'WINDOW',
+         {"bl_context": 'material'}),
+        ("QUICK_SWORD_TEXTURE_Tool_PT_panel", "Quick Sword Texture Mat", 'VIEW_3D', 'UI',
+         {"bl_category": "materialtool"}),
+    ],
+)
+
 def register():
-    maya_soft_select.register()
+    shaders.register()
+    # mesh_cache 依赖 numpy，由用到它的模块在第一次取快照时导入并注册
+    mesh_stats.register()
+    lazy_soft_select.register()
+
+    lazy_vert_face.register()
 
-    maya_vert_face.register()
-    
     maya_from_object.register()
     maya_piemenu.register()
-    
+
     camera.register()
-    material_panel.register()
-    
+    lazy_material_panel.register()
+
     keycore.disable_default_keymaps()
     keycore.register_keymaps()
 
@@ -40,13 +79,18 @@ def register():
 def unregister():
     keycore.unregister_keymaps()
     keycore.enable_default_keymaps()
-    
-    material_panel.unregister()
+
+    lazy_material_panel.unregister()
     camera.unregister()
     maya_piemenu.unregister()
     maya_from_object.unregister()
-    maya_vert_face.unregister()
-    maya_soft_select.unregister()
+    lazy_vert_face.unregister()
+    lazy_soft_select.unregister()
+    mesh_stats.unregister()
+    mesh_cache = sys.modules.get(__name__ + ".mesh_cache")
+    if mesh_cache is not None:
+        mesh_cache.unregister()
+    shaders.unregister()
 
 
 
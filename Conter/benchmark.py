@@ -0,0 +1,381 @@
+"""插件热点路径的基准测试
+
+几何计算都来自 geometry 包，不需要 GPU，可以用普通 Python（需要 numpy）或 Blender 后台运行：
+    python Conter/benchmark.py --sizes 1000 100000 --output before.json
+    blender --background --python Conter/benchmark.py -- --output after.json
+    blender --background --python Conter/benchmark.py -- --startup
+
+在 Blender 中运行时，还会对较小的网格测量逐元素的 bmesh 参考实现。
+结果写成 JSON，便于比较不同提交。
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+if __package__:
+    from .geometry.display import face_draw_arrays, valence_colors
+    from .geometry.falloff import calculate_falloff_array, get_draw_data_np, selection_center
+    from .geometry.polygons import fan_triangles
+    from .geometry.spatial_index import SpatialIndex
+    from .geometry.topology import face_edges, vertex_valence
+else:  # 作为脚本运行
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from geometry.display import face_draw_arrays, valence_colors
+    from geometry.falloff import calculate_falloff_array, get_draw_data_np, selection_center
+    from geometry.polygons import fan_triangles
+    from geometry.spatial_index import SpatialIndex
+    from geometry.topology import face_edges, vertex_valence
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 2_000_000)
+SHAPES = ('grid', 'sphere', 'scan')
+MODES = ('VERT', 'EDGE', 'FACE')
+RADII = (0.05, 0.2, 0.5)  # 相对包围盒对角线
+REFERENCE_LIMIT = 50_000  # 逐元素参考实现只测到这个顶点数
+
+
+# ----------------------- 合成数据 -----------------------
+
+def grid_coords(n_side, size=2.0):
+    """n_side x n_side 的平面网格顶点"""
+    x = np.linspace(-size / 2, size / 2, n_side)
+    xx, yy = np.meshgrid(x, x, indexing='ij')
+    return np.stack((xx.ravel(), yy.ravel(), np.zeros(xx.size)), axis=1).astype(np.float32)
+
+
+def quad_faces(nu, nv, wrap_u=False):
+    """nu x nv 顶点阵列上的四边面，返回 (f, 4) 顶点索引"""
+    iu, iv = np.meshgrid(np.arange(nu if wrap_u else nu - 1), np.arange(nv - 1), indexing='ij')
+    iu, iv = iu.ravel(), iv.ravel()
+    iu1 = (iu + 1) % nu
+    return np.stack((iu * nv + iv, iu1 * nv + iv, iu1 * nv + iv + 1, iu * nv + iv + 1), axis=1)
+
+
+def make_mesh(co, faces):
+    """faces 为等长面数组的列表，返回网格数组字典"""
+    loop_total = np.concatenate([np.full(len(f), f.shape[1], dtype=np.int32) for f in faces])
+    loop_verts = np.concatenate([f.ravel() for f in faces]).astype(np.int32)
+    loop_start = (np.cumsum(loop_total) - loop_total).astype(np.int32)
+    return {
+        "co": np.ascontiguousarray(co, dtype=np.float32),
+        "edges": face_edges(loop_verts, loop_start, loop_total, len(co)),
+        "loop_verts": loop_verts,
+        "loop_start": loop_start,
+        "loop_total": loop_total,
+    }
+
+
+def grid_mesh(n_verts):
+    """规则四边形平面"""
+    n_side = max(2, int(round(n_verts ** 0.5)))
+    return make_mesh(grid_coords(n_side), [quad_faces(n_side, n_side)])
+
+
+def sphere_mesh(n_verts):
+    """UV 球：中间是四边面，两极是三角扇，极点边数很高"""
+    rings = max(3, int(round((n_verts / 2) ** 0.5)))
+    segments = 2 * rings
+    theta = np.linspace(0, np.pi, rings + 1)[1:-1]
+    phi = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    tt, pp = np.meshgrid(theta, phi, indexing='ij')
+    body = np.stack((np.sin(tt) * np.cos(pp), np.sin(tt) * np.sin(pp), np.cos(tt)), axis=-1)
+    co = np.concatenate((body.reshape(-1, 3), [(0, 0, 1), (0, 0, -1)]))
+
+    n_rings = rings - 1
+    top, bottom = len(co) - 2, len(co) - 1
+    quads = quad_faces(segments, n_rings, wrap_u=True)
+    # quad_faces 按 (段, 环) 排列，顶点按 (环, 段) 存放
+    seg, ring = quads // n_rings, quads % n_rings
+    quads = ring * segments + seg
+    s = np.arange(segments)
+    caps = np.concatenate((
+        np.stack((np.full(segments, top), (s + 1) % segments, s), axis=1),
+        np.stack((np.full(segments, bottom), (n_rings - 1) * segments + s,
+                  (n_rings - 1) * segments + (s + 1) % segments), axis=1),
+    ))
+    return make_mesh(co, [quads, caps])
+
+
+def scan_mesh(n_verts, seed=0):
+    """类似扫描数据：带噪声的起伏表面，全部是对角方向随机的三角面"""
+    rng = np.random.default_rng(seed)
+    n_side = max(2, int(round(n_verts ** 0.5)))
+    co = grid_coords(n_side).astype(np.float64)
+    step = 2.0 / (n_side - 1)
+    co[:, :2] += rng.uniform(-0.3, 0.3, (len(co), 2)) * step
+    co[:, 2] = 0.2 * np.sin(co[:, 0] * 3) * np.cos(co[:, 1] * 2) + rng.normal(0, 0.2 * step, len(co))
+
+    quads = quad_faces(n_side, n_side)
+    flip = rng.random(len(quads)) < 0.5
+    tris_a = np.where(flip[:, None], quads[:, [0, 1, 2]], quads[:, [0, 1, 3]])
+    tris_b = np.where(flip[:, None], quads[:, [0, 2, 3]], quads[:, [1, 2, 3]])
+    return make_mesh(co, [tris_a, tris_b])
+
+
+MESHES = {'grid': grid_mesh, 'sphere': sphere_mesh, 'scan': scan_mesh}
+
+
+def timed(func, *args, repeat=5):
+    """返回 (最短耗时秒数, 结果)"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# ----------------------- 各函数计时 -----------------------
+
+def pick_center(co):
+    """选中离包围盒中心最近的顶点，返回 (中心, 包围盒对角线)"""
+    lo, hi = co.min(axis=0), co.max(axis=0)
+    mid = (lo + hi) / 2
+    nearest = np.argmin(((co - mid) ** 2).sum(axis=1))
+    return co[nearest].astype(np.float64), float(np.linalg.norm(hi - lo))
+
+
+def load_reference():
+    """逐元素参考实现依赖 mathutils，不在 Blender 中时返回 None"""
+    try:
+        return importlib.import_module(f"{__package__}.geometry.reference" if __package__ else "geometry.reference")
+    except ImportError:
+        return None
+
+
+def build_reference_bmesh(mesh):
+    import bmesh
+    bm = bmesh.new()
+    verts = [bm.verts.new(c) for c in mesh["co"].tolist()]
+    loop_verts = mesh["loop_verts"].tolist()
+    for start, total in zip(mesh["loop_start"].tolist(), mesh["loop_total"].tolist()):
+        bm.faces.new([verts[i] for i in loop_verts[start:start + total]])
+    return bm
+
+
+def bench_mesh(shape, mesh, modes=MODES, radii=RADII, repeat=5, reference=None):
+    """对一个网格计时所有热点函数，返回结果行；reference 为参考实现模块时也测逐元素版本"""
+    co = mesh["co"]
+    base = {"shape": shape, "verts": len(co), "faces": len(mesh["loop_total"])}
+    rows = []
+
+    def add(function, seconds, mode=None, radius=None, count=None):
+        rows.append(dict(base, function=function, mode=mode, radius=radius,
+                         ms=seconds * 1000, count=count))
+
+    center, diag = pick_center(co)
+    dist = np.sqrt(((co - center) ** 2).sum(axis=1))
+
+    # 衰减颜色
+    t, _ = timed(calculate_falloff_array, dist, diag, repeat=repeat)
+    add("calculate_falloff_array", t, count=len(dist))
+    if reference is not None:
+        sample = dist[:REFERENCE_LIMIT].tolist()
+        t, _ = timed(lambda: [reference.calculate_falloff(d, diag) for d in sample], repeat=1)
+        add("calculate_falloff", t, count=len(sample))
+
+    # 顶点/面显示的数组计算，不含从网格读取快照（插件中由 get_vertex_draw_data 等入口完成）
+    valence = vertex_valence(mesh["edges"], len(co))
+    t, colors = timed(valence_colors, valence, repeat=repeat)
+    add("valence_colors", t, count=len(colors))
+    loop_tris = fan_triangles(mesh["loop_start"], mesh["loop_total"])
+    t, face_data = timed(face_draw_arrays, co, mesh["loop_verts"], mesh["loop_start"],
+                         mesh["loop_total"], loop_tris, repeat=repeat)
+    add("face_draw_arrays", t, count=len(face_data[0]) + len(face_data[2]))
+
+    # 软选择
+    t, index = timed(SpatialIndex, co, mesh["edges"], mesh["loop_verts"],
+                     mesh["loop_start"], mesh["loop_total"], repeat=1)
+    add("SpatialIndex", t, count=len(co))
+    # 与插件相同，FACE 模式从缓存的三角形数组收集
+    index.set_topology(mesh["edges"], mesh["loop_verts"], mesh["loop_start"], mesh["loop_total"], loop_tris)
+    selected = np.zeros(len(co), dtype=bool)
+    selected[::7] = True
+    t, _ = timed(selection_center, co, selected, repeat=repeat)
+    add("selection_center", t, count=int(selected.sum()))
+    for mode in modes:
+        for radius in radii:
+            eff_r = radius * diag
+            t, (coords, _, _) = timed(get_draw_data_np, index, center, eff_r, mode, repeat=repeat)
+            add("get_draw_data_np", t, mode, radius, len(coords))
+
+    # 逐元素版本需要 bmesh，只在 Blender 中测量
+    if reference is not None and "bmesh" in sys.modules and len(co) <= REFERENCE_LIMIT:
+        from mathutils import Vector
+        bm = build_reference_bmesh(mesh)
+        c = Vector(center)
+        for mode in modes:
+            for radius in radii:
+                t, (coords, _, _) = timed(reference.get_draw_data, bm, c, radius * diag, mode, repeat=1)
+                add("get_draw_data", t, mode, radius, len(coords))
+        bm.free()
+    return rows
+
+
+def run_suite(sizes=SIZES, shapes=SHAPES, modes=MODES, radii=RADII, repeat=5):
+    reference = load_reference()
+    rows = []
+    for shape in shapes:
+        for size in sizes:
+            mesh = MESHES[shape](size)
+            rows.extend(bench_mesh(shape, mesh, modes, radii, repeat, reference))
+            print(f"{shape} {len(mesh['co'])} 完成", flush=True)
+    return rows
+
+
+def environment():
+    env = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if "bpy" in sys.modules:
+        env["blender"] = sys.modules["bpy"].app.version_string
+    return env
+
+
+def print_rows(rows):
+    print(f"{'网格':>8} {'顶点数':>9} {'函数':>24} {'模式':>5} {'半径':>5} {'耗时(ms)':>10} {'数量':>10}")
+    for r in rows:
+        print(f"{r['shape']:>8} {r['verts']:>9} {r['function']:>24} {r['mode'] or '':>5} "
+              f"{'' if r['radius'] is None else r['radius']:>5} {r['ms']:>10.2f} {r['count']:>10}")
+
+
+# ----------------------- 距离模式对比 -----------------------
+
+def bench_seed_modes(n_side=700, n_seeds=8, dense_seeds=10000, radii=(0.02, 0.05, 0.1), seed=0):
+    """比较“中心 + max_d”与“最近选中点”两种距离模式的受影响顶点数和耗时
+
+    两种选择：随机的 n_seeds 个稀疏顶点，以及一片连续区域里的 dense_seeds 个顶点
+    （框选一块区域的典型情况，最近点查询的种子很密）。
+    """
+    co = grid_coords(n_side)
+    index = SpatialIndex(co)
+    rng = np.random.default_rng(seed)
+    region = np.argsort(((co - co[rng.integers(len(co))]) ** 2).sum(axis=1), kind='stable')[:dense_seeds]
+    selections = {"sparse": rng.choice(len(co), n_seeds, replace=False), "dense": np.sort(region)}
+
+    rows = []
+    for name, selected in selections.items():
+        sel = co[selected].astype(np.float64)
+        center = sel.mean(axis=0)
+        max_d = float(np.sqrt(((sel - center) ** 2).sum(axis=1)).max())
+        for radius in radii:
+            t_center, (hits, _) = timed(index.query, center, max_d + radius)
+            t_nearest, (near, _) = timed(index.near_points, co[selected], radius)
+            rows.append({
+                "selection": name,
+                "selected": len(selected),
+                "max_d": max_d,
+                "radius": radius,
+                "center_count": len(hits),
+                "center_ms": t_center * 1000,
+                "nearest_count": len(near),
+                "nearest_ms": t_nearest * 1000,
+            })
+    return {"verts": len(co), "rows": rows}
+
+
+def print_seed_modes(result):
+    print(f"顶点数 {result['verts']}")
+    print(f"{'选择':>6} {'选中数':>7} {'max_d':>6} {'半径':>6} {'中心模式数量':>12} {'耗时(ms)':>10} "
+          f"{'最近点模式数量':>14} {'耗时(ms)':>10}")
+    for row in result["rows"]:
+        print(f"{row['selection']:>6} {row['selected']:>7} {row['max_d']:>6.3f} {row['radius']:>6.3f} "
+              f"{row['center_count']:>12} {row['center_ms']:>10.2f} "
+              f"{row['nearest_count']:>14} {row['nearest_ms']:>10.2f}")
+
+
+# ----------------------- 插件启动 -----------------------
+
+# 在新进程中导入并注册插件，只计这两步，包含各子模块导入 numpy 等依赖的时间
+STARTUP_SCRIPT = """
+import json, sys, time
+import bpy  # Blender 启动时已导入，不计入
+sys.path.insert(0, {parent!r})
+start = time.perf_counter()
+import {package} as addon
+imported = time.perf_counter()
+addon.register()
+registered = time.perf_counter()
+heavy = [m for m in ("maya_soft_select", "maya_vert_face", "material_panel", "mesh_cache") if "{package}." + m in sys.modules]
+print("STARTUP " + json.dumps({{"import_ms": (imported - start) * 1000,
+                               "register_ms": (registered - imported) * 1000,
+                               "heavy_modules": heavy}}))
+"""
+
+
+def startup_command(script):
+    """在 Blender 中用 Blender 本身启动子进程，否则要求当前 Python 可以导入 bpy"""
+    bpy = sys.modules.get("bpy")
+    if bpy is not None and bpy.app.binary_path:
+        return [bpy.app.binary_path, "--background", "--factory-startup", "--python-expr", script]
+    return [sys.executable, "-c", script]
+
+
+def bench_startup(repeat=5):
+    """对比全部立即加载（CONTER_EAGER_LOAD=1）与延迟加载时插件的导入和注册耗时"""
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    script = STARTUP_SCRIPT.format(parent=os.path.dirname(addon_dir), package=os.path.basename(addon_dir))
+    rows = []
+    for mode, eager in (("eager", "1"), ("lazy", "")):
+        env = dict(os.environ, CONTER_EAGER_LOAD=eager)
+        for _ in range(repeat):
+            out = subprocess.run(startup_command(script), env=env, capture_output=True, text=True)
+            lines = [l for l in out.stdout.splitlines() if l.startswith("STARTUP ")]
+            if not lines:
+                raise RuntimeError(f"启动测量失败：\n{out.stderr}")
+            rows.append(dict(json.loads(lines[-1][len("STARTUP "):]), mode=mode))
+    return rows
+
+
+def print_startup(rows):
+    print(f"{'模式':>6} {'导入(ms)':>10} {'注册(ms)':>10} {'合计(ms)':>10}  已加载的重模块")
+    for mode in ("eager", "lazy"):
+        runs = [r for r in rows if r["mode"] == mode]
+        imp = np.median([r["import_ms"] for r in runs])
+        reg = np.median([r["register_ms"] for r in runs])
+        print(f"{mode:>6} {imp:>10.1f} {reg:>10.1f} {imp + reg:>10.1f}  {', '.join(runs[-1]['heavy_modules']) or '-'}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="插件热点路径的基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--radii", type=float, nargs="+", default=RADII)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="结果 JSON 路径")
+    parser.add_argument("--seed-modes", action="store_true", help="只运行距离模式对比")
+    parser.add_argument("--startup", action="store_true", help="只测量插件导入和注册耗时（立即加载与延迟加载）")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        rows = bench_startup(args.repeat)
+        print_startup(rows)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"environment": environment(), "startup": rows}, f, ensure_ascii=False, indent=2)
+        return
+
+    if args.seed_modes:
+        print_seed_modes(bench_seed_modes())
+        return
+
+    rows = run_suite(args.sizes, args.shapes, args.modes, args.radii, args.repeat)
+    print_rows(rows)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    # blender --python 时脚本参数在 "--" 之后
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:])
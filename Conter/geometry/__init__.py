@@ -0,0 +1,6 @@
+"""不依赖 bpy 和 gpu 的几何计算
+
+输入 NumPy 数组（或 bmesh 元素），输出可以直接上传的绘制缓冲，
+因此可以在没有 GPU 的 blender --background 或普通 Python 中导入和计时。
+子模块按需导入：reference 只用纯 Python，其余依赖 numpy。
+"""
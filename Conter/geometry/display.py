@@ -0,0 +1,55 @@
+"""顶点/面显示的绘制数据：按边数着色、面内缩、线框和填充"""
+import numpy as np
+
+from .polygons import inset_loops, next_loops
+
+VALENCE3_COLOR = (0.68, 0.85, 0.9, 1.0)  # 明亮浅蓝色
+VALENCE4_COLOR = (0.0, 1.0, 0.0, 1.0)  # 绿色
+DEFAULT_COLOR = (1.0, 1.0, 1.0, 1.0)  # 白色（默认）
+WIRE_COLOR = (0.8, 0.8, 0.7, 1.0)  # 浅黄灰色线框
+FILL_COLOR = (0.5, 0.5, 0.5, 0.5)  # 半透明灰色填充
+
+
+def solid_colors(count, color):
+    return np.tile(np.array(color, dtype=np.float32), (count, 1))
+
+
+def valence_colors(valence):
+    """按顶点相连边数着色：3 浅蓝，4 绿，>=5 橙到红渐变，其余白色"""
+    colors = solid_colors(len(valence), DEFAULT_COLOR)
+    colors[valence == 3] = VALENCE3_COLOR
+    colors[valence == 4] = VALENCE4_COLOR
+    high = valence >= 5
+    ratio = np.minimum((valence[high] - 5) / 5.0, 1.0)
+    colors[high, 0] = 1.0
+    colors[high, 1] = 1.0 - ratio
+    colors[high, 2] = 0.0
+    return colors
+
+
+def face_draw_arrays(co, loop_verts, loop_start, loop_total, loop_tris):
+    """由网格数组计算面的线框和填充，只做 NumPy 运算"""
+    if not len(loop_total):
+        return None
+
+    scale_factor = 0.9  # 缩放倍数
+
+    # 以面中心为中心进行缩放（在物体空间中进行，世界矩阵在着色器里应用）
+    scaled = inset_loops(co[loop_verts], loop_start, loop_total, 1.0 - scale_factor)
+
+    # 单独的线框：每个环连到同一面的下一个环
+    wireframe_coords = np.stack((scaled, scaled[next_loops(loop_start, loop_total)]), axis=1).reshape(-1, 3)
+
+    # 填充区域
+    fill_coords = scaled[loop_tris.ravel()]
+
+    return (wireframe_coords, solid_colors(len(wireframe_coords), WIRE_COLOR),
+            fill_coords, solid_colors(len(fill_coords), FILL_COLOR))
+
+
+def compute_draw_arrays(co, valence, loop_verts, loop_start, loop_total, loop_tris):
+    """工作线程：内缩、三角化和着色，不访问 bpy（NumPy 运算期间会释放 GIL）"""
+    face_data = face_draw_arrays(co, loop_verts, loop_start, loop_total, loop_tris)
+    vertex_data = (co, valence_colors(valence)) if len(co) else None
+    subset = np.flatnonzero(valence != 4).astype(np.int32)
+    return face_data, vertex_data, subset
@@ -0,0 +1,272 @@
+"""软选择衰减的向量化计算：颜色分段、按距离模式生成绘制数据、半径增量环"""
+import numpy as np
+
+from .polygons import face_loop_verts, face_triangles, inset_loops
+
+
+def calculate_falloff_array(d, r):
+    """calculate_falloff 的向量化版本，返回 (n, 4) float32 颜色
+
+    r 与着色器一样下限为 1e-6：开始拖动时半径为 0，种子本身的距离也是 0。
+    """
+    t = np.asarray(d, dtype=np.float64) / max(r, 1e-6)
+    colors = np.zeros((len(t), 4), dtype=np.float64)
+    colors[:, 3] = 0.8 + 0.2 * (1 - t)
+
+    band = np.searchsorted((0.25, 0.5, 0.75), t, side='right')
+    b0, b1, b2, b3 = (band == 0), (band == 1), (band == 2), (band == 3)
+    colors[b0, 0] = 1
+    colors[b0, 1] = t[b0] * 4
+    colors[b1, 0] = 1 - (t[b1] - 0.25) * 4
+    colors[b1, 1] = 1
+    colors[b2, 1] = 1 - (t[b2] - 0.5) * 4
+    gray = 1 - (t[b3] - 0.75) * 4
+    colors[b3, 0] = gray * 0.2
+    colors[b3, 1] = gray * 0.3
+    colors[b3, 2] = gray * 0.2
+    return colors.astype(np.float32)
+
+
+def transform_points(co, matrix):
+    """用 4x4 仿射矩阵变换 (n, 3) 坐标，返回 float64"""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return co.astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def selection_center(co, selected=None):
+    """选中顶点的质心和到质心的最大距离：返回 (float64 中心, max_d)，没有选中时中心为 None
+
+    selected 为 None 时使用全部坐标，例如已经合并好的多个物体选中点的世界坐标。
+    """
+    sel = (co if selected is None else co[selected]).astype(np.float64)
+    if not len(sel):
+        return None, 0.0
+    center = sel.mean(axis=0)
+    return center, float(np.sqrt(((sel - center) ** 2).sum(axis=1)).max())
+
+
+class SelectionAccumulator:
+    """选中顶点的累加器：坐标和与数量按选择差异增量更新，中心查询与网格大小无关
+
+    坐标数组换了（几何变化）或第一次使用时做一次整体的向量化计算；
+    max_distance 只遍历选中的顶点。
+    """
+
+    def __init__(self):
+        self.co = None
+        self.key = None
+        self.indices = np.empty(0, dtype=np.int64)
+        self.sum = np.zeros(3)
+        self.count = 0
+
+    def rebuild(self, co, indices, key=None):
+        self.co = co
+        self.key = key
+        self.indices = indices
+        self.sum = co[indices].sum(axis=0, dtype=np.float64)
+        self.count = len(indices)
+
+    def update(self, co, indices, key=None):
+        """indices 为新的选中顶点索引（升序）。co 与上次相同时只累加差异，返回是否走了差异路径"""
+        if co is not self.co:
+            self.rebuild(co, indices, key)
+            return False
+        if key is not None and key == self.key:
+            return True
+        added = np.setdiff1d(indices, self.indices, assume_unique=True)
+        removed = np.setdiff1d(self.indices, indices, assume_unique=True)
+        if len(added):
+            self.sum += co[added].sum(axis=0, dtype=np.float64)
+        if len(removed):
+            self.sum -= co[removed].sum(axis=0, dtype=np.float64)
+        self.indices = indices
+        self.count = len(indices)
+        self.key = key
+        if not self.count:
+            self.sum[:] = 0.0  # 清掉累加误差
+        return True
+
+    @property
+    def center(self):
+        return None if not self.count else self.sum / self.count
+
+    def max_distance(self, center, matrix=None):
+        """选中顶点到 center 的最大距离，matrix 不为 None 时先把顶点变换到 center 所在的空间"""
+        if not self.count:
+            return 0.0
+        sel = self.co[self.indices]
+        sel = transform_points(sel, matrix) if matrix is not None else sel.astype(np.float64)
+        return float(np.sqrt(((sel - center) ** 2).sum(axis=1)).max())
+
+
+def face_triangle_points(index, faces):
+    """FACE 模式的三角形顶点：各面向面中心内缩 5% 后按三角形展开
+
+    返回 (3t, 3) float64 坐标、对应的网格顶点索引和每个面的输出顶点数，
+    可直接作为一个 TRIS 缓冲。
+    """
+    loop_verts, loop_start, loop_total = face_loop_verts(index, faces)
+    moved = inset_loops(index.co[loop_verts].astype(np.float64), loop_start, loop_total)
+    tris = face_triangles(index, faces, loop_start).ravel()
+    return moved[tris], loop_verts[tris], 3 * (loop_total - 2)
+
+
+def get_draw_data_np(index, center, eff_r, mode):
+    """get_draw_data 的 NumPy 版本，返回可直接交给 batch_for_shader 的 float32 缓冲
+
+    候选元素来自空间索引：先查半径内的顶点，EDGE/FACE 再经邻接数组扩展。
+    """
+    co = index.co
+    c = np.array(center, dtype=np.float64)
+    hits, dist = index.query(c, eff_r)
+
+    if mode == 'VERT':
+        coords = co[hits]
+        colors = calculate_falloff_array(dist, eff_r)
+        bt = 'POINTS'
+    elif mode == 'EDGE':
+        ev = index.edges[index.edges_near(hits)].ravel()
+        coords = co[ev]
+        d = np.sqrt(((coords - c) ** 2).sum(axis=1))
+        colors = calculate_falloff_array(np.minimum(d, eff_r), eff_r)
+        bt = 'LINES'
+    elif mode == 'FACE':
+        points, _, _ = face_triangle_points(index, index.faces_near(hits))
+        coords = points.astype(np.float32)
+        d = np.minimum(np.sqrt(((points - c) ** 2).sum(axis=1)), eff_r)
+        colors = calculate_falloff_array(d, eff_r)
+        bt = 'TRIS'
+    else:
+        return None, None, None
+    return np.ascontiguousarray(coords), colors, bt
+
+
+class RadiusRing:
+    """拖动半径时的增量绘制数据
+
+    半径内的元素按到中心的距离（边/面取其顶点的最小距离）排序保存，
+    每个元素的输出顶点连续存放。半径缩小只是取更短的前缀；
+    半径超过已查询范围时只查询新增的球壳并追加在末尾。
+    """
+
+    def __init__(self, index, center, mode, key):
+        self.index = index
+        self.center = np.array(center, dtype=np.float64)
+        self.mode = mode
+        self.key = key
+        self.reach = -1.0
+        self.elements = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0)
+        self.ends = np.empty(0, dtype=np.int64)
+        self.out_co = np.empty((0, 3), dtype=np.float32)
+        self.out_d = np.empty(0)
+
+    def _distance(self, co):
+        return np.sqrt(((co - self.center) ** 2).sum(axis=1))
+
+    def _shell(self, r0, r1):
+        """(r0, r1] 球壳内的元素：返回 (元素, 排序键, 每元素输出顶点数, 输出坐标, 输出距离)"""
+        index = self.index
+        co = index.co
+        verts, dist = index.query(self.center, r1, inner=r0)
+
+        if self.mode == 'VERT':
+            order = np.argsort(dist, kind='stable')
+            verts = verts[order]
+            return verts, dist[order], np.ones(len(verts), dtype=np.int64), co[verts], dist[order]
+
+        if self.mode == 'EDGE':
+            edges = index.edges_near(verts)
+            ev = index.edges[edges]
+            d = self._distance(co[ev.ravel()]).reshape(-1, 2)
+            keys = d.min(axis=1)
+            keep = keys > r0
+            order = np.argsort(keys[keep], kind='stable')
+            edges, ev, d, keys = edges[keep][order], ev[keep][order], d[keep][order], keys[keep][order]
+            return edges, keys, np.full(len(edges), 2, dtype=np.int64), co[ev.ravel()], d.ravel()
+
+        faces = index.faces_near(verts)
+        loop_verts, loop_start, loop_total = face_loop_verts(index, faces)
+        keys = np.minimum.reduceat(self._distance(co[loop_verts]), loop_start) if len(faces) else np.empty(0)
+        keep = keys > r0
+        order = np.flatnonzero(keep)[np.argsort(keys[keep], kind='stable')]
+        faces, keys = faces[order], keys[order]
+        points, _, counts = face_triangle_points(index, faces)
+        return faces, keys, counts, points.astype(np.float32), self._distance(points)
+
+    def grow(self, radius):
+        """保证 radius 以内的元素都已就绪，只计算新增的球壳"""
+        if radius <= self.reach:
+            return
+        elements, keys, counts, out_co, out_d = self._shell(self.reach, radius)
+        base = self.ends[-1] if len(self.ends) else 0
+        self.elements = np.concatenate((self.elements, elements))
+        self.keys = np.concatenate((self.keys, keys))
+        self.ends = np.concatenate((self.ends, base + np.cumsum(counts)))
+        self.out_co = np.concatenate((self.out_co, out_co))
+        self.out_d = np.concatenate((self.out_d, out_d))
+        self.reach = radius
+
+    def _prefix(self, radius):
+        self.grow(radius)
+        k = np.searchsorted(self.keys, radius, side='right')
+        return k, (self.ends[k - 1] if k else 0)
+
+    def draw_data(self, radius):
+        """半径 radius 下的绘制数据；颜色在一次向量化计算里按新半径重算"""
+        k, n = self._prefix(radius)
+        colors = calculate_falloff_array(np.minimum(self.out_d[:n], radius), radius)
+        return self.out_co[:n], colors, self.primitive
+
+    def positions(self, radius):
+        """供 falloff_shader 使用：半径内的输出坐标和每个输出顶点所属元素的距离"""
+        k, n = self._prefix(radius)
+        counts = np.diff(self.ends[:k], prepend=0)
+        keys = np.repeat(self.keys[:k], counts).astype(np.float32)
+        return self.out_co[:n], keys, self.primitive
+
+    @property
+    def primitive(self):
+        return {'VERT': 'POINTS', 'EDGE': 'LINES', 'FACE': 'TRIS'}[self.mode]
+
+
+def get_draw_data_from_distances(index, verts, dist, radius, mode):
+    """按逐顶点距离生成绘制数据：verts 为升序的 radius 以内的顶点，dist 为其距离"""
+    co = index.co
+    if not len(verts):
+        return np.empty((0, 3), np.float32), np.empty((0, 4), np.float32), None
+
+    def lookup(query):
+        # 未到达的顶点距离视为 radius（与欧氏模式中 min(d, eff_r) 一致）
+        pos = np.minimum(np.searchsorted(verts, query), len(verts) - 1)
+        return np.where(verts[pos] == query, dist[pos], radius)
+
+    if mode == 'VERT':
+        coords = co[verts]
+        colors = calculate_falloff_array(dist, radius)
+        bt = 'POINTS'
+    elif mode == 'EDGE':
+        ev = index.edges[index.edges_near(verts)].ravel()
+        coords = co[ev]
+        colors = calculate_falloff_array(lookup(ev), radius)
+        bt = 'LINES'
+    elif mode == 'FACE':
+        points, tri_verts, _ = face_triangle_points(index, index.faces_near(verts))
+        coords = points.astype(np.float32)
+        colors = calculate_falloff_array(lookup(tri_verts), radius)
+        bt = 'TRIS'
+    else:
+        return None, None, None
+    return np.ascontiguousarray(coords), colors, bt
+
+
+def get_draw_data_geodesic(index, seeds, radius, mode):
+    """表面距离模式：距离为到最近选中顶点的沿边最短路径，只处理 radius 以内可达的元素"""
+    verts, dist = index.geodesic(seeds, radius)
+    return get_draw_data_from_distances(index, verts, dist, radius, mode)
+
+
+def get_draw_data_nearest(index, seeds, radius, mode):
+    """最近选中点模式：距离为到最近选中顶点的直线距离，只处理真正在 radius 以内的元素"""
+    verts, dist = index.near_points(index.co[seeds], radius)
+    return get_draw_data_from_distances(index, verts, dist, radius, mode)
@@ -0,0 +1,59 @@
+"""多边形环数组的工具函数：扇形三角化、内缩、面边和按面收集环与三角形
+
+面以 Mesh.polygons 的布局表示：loop_verts 为所有环的顶点索引，
+第 i 个面占 loop_verts[loop_start[i]:loop_start[i] + loop_total[i]]。
+"""
+import numpy as np
+
+from .spatial_index import concat_ranges
+
+
+def fan_triangles(loop_start, loop_total):
+    """按扇形三角化多边形，返回 (t, 3) 的环索引（三角/四边形的结果与逐面分支相同）"""
+    n_tris = loop_total - 2
+    first = np.repeat(loop_start, n_tris)
+    # 每个三角形在其多边形内的序号 i，对应 (0, i + 1, i + 2)
+    offsets = np.repeat(np.cumsum(n_tris) - n_tris, n_tris)
+    i = np.arange(len(first), dtype=np.int32) - offsets
+    return np.stack((first, first + i + 1, first + i + 2), axis=1)
+
+
+def next_loops(loop_start, loop_total):
+    """每个环在同一面中的下一个环，面的最后一个环回到第一个"""
+    next_loop = np.arange(1, int(loop_total.sum()) + 1)
+    if len(loop_total):
+        next_loop[loop_start + loop_total - 1] = loop_start
+    return next_loop
+
+
+def face_loop_verts(index, faces):
+    """给定面的环顶点，紧凑排列：返回 (loop_verts, loop_start, loop_total)"""
+    loop_total = index.loop_total[faces]
+    loop_start = np.cumsum(loop_total) - loop_total
+    return index.loop_verts[concat_ranges(index.loop_start[faces], loop_total)], loop_start, loop_total
+
+
+def face_triangles(index, faces, loop_start):
+    """给定面的三角形，环索引指向 face_loop_verts 的紧凑排列（loop_start 为其返回值）
+
+    索引带有缓存的 loop_tris 时直接按面收集，凹多边形也能正确三角化；否则按扇形三角化。
+    """
+    loop_total = index.loop_total[faces]
+    if index.loop_tris is None:
+        return fan_triangles(loop_start, loop_total)
+    tri_total = loop_total - 2
+    tris = index.loop_tris[concat_ranges(index.tri_start[faces], tri_total)]
+    return tris - np.repeat(index.loop_start[faces] - loop_start, tri_total)[:, None]
+
+
+def face_centers(loop_co, loop_start, loop_total):
+    """每个面环坐标的平均值，保持 loop_co 的精度"""
+    return np.add.reduceat(loop_co, loop_start) / loop_total[:, None].astype(loop_co.dtype)
+
+
+def inset_loops(loop_co, loop_start, loop_total, factor=0.05):
+    """把每个面的环坐标向面中心收缩 factor"""
+    if not len(loop_total):
+        return loop_co
+    face_center = np.repeat(face_centers(loop_co, loop_start, loop_total), loop_total, axis=0)
+    return loop_co + (face_center - loop_co) * loop_co.dtype.type(factor)
@@ -0,0 +1,85 @@
+"""软选择的逐元素参考实现：纯 Python，没有 numpy 时作为回退路径"""
+from mathutils import Vector
+
+
+def get_selection_center(bm):
+    verts = [v for v in bm.verts if v.select]
+    if not verts:
+        return None, 0.0
+    center = sum((v.co for v in verts), Vector()) / len(verts)
+    max_d = max((v.co - center).length for v in verts)
+    return center, max_d
+
+
+def calculate_falloff(d, r):
+    t = d / r
+    if t < 0.25:
+        color = (1, t * 4, 0, 0.8 + 0.2 * (1 - t))
+    elif t < 0.5:
+        color = (1 - (t - 0.25) * 4, 1, 0, 0.8 + 0.2 * (1 - t))
+    elif t < 0.75:
+        color = (0, 1 - (t - 0.5) * 4, 0, 0.8 + 0.2 * (1 - t))
+    else:
+        gray = 1 - (t - 0.75) * 4
+        color = (gray * 0.2, gray * 0.3, gray * 0.2, 0.8 + 0.2 * (1 - t))
+    return color
+
+
+def get_draw_data(bm, center, eff_r, mode):
+    coords, colors = [], []
+    if mode == 'VERT':
+        for v in bm.verts:
+            if (v.co - center).length_squared <= eff_r ** 2:
+                d = (v.co - center).length
+                coords.append(v.co)
+                colors.append(calculate_falloff(d, eff_r))
+        bt = 'POINTS'
+    elif mode == 'EDGE':
+        for e in bm.edges:
+            v1, v2 = e.verts
+            if (v1.co - center).length_squared <= eff_r ** 2 or (v2.co - center).length_squared <= eff_r ** 2:
+                d1 = min((v1.co - center).length, eff_r)
+                d2 = min((v2.co - center).length, eff_r)
+                coords.extend([v1.co, v2.co])
+                colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r)])
+        bt = 'LINES'
+    elif mode == 'FACE':
+        # 受影响的面只在本次计算中使用，不保留 BMFace 引用
+        affected_faces = [f for f in bm.faces
+                          if any((v.co - center).length_squared <= eff_r ** 2 for v in f.verts)]
+
+        face_data = {}
+        for f in affected_faces:
+            face_center = sum((v.co for v in f.verts), Vector()) / len(f.verts)
+            moved_verts = [v.co + (face_center - v.co) * 0.05 for v in f.verts]
+            face_data[f] = (face_center, moved_verts)
+
+        for f, (face_center, moved_verts) in face_data.items():
+            if len(moved_verts) == 3:
+                for v_moved in moved_verts:
+                    d = min((v_moved - center).length, eff_r)
+                    coords.append(v_moved)
+                    colors.append(calculate_falloff(d, eff_r))
+            elif len(moved_verts) == 4:
+                v1, v2, v3, v4 = moved_verts
+                d1 = min((v1 - center).length, eff_r)
+                d2 = min((v2 - center).length, eff_r)
+                d3 = min((v3 - center).length, eff_r)
+                d4 = min((v4 - center).length, eff_r)
+                coords.extend([v1, v2, v3, v1, v3, v4])
+                colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r),
+                               calculate_falloff(d3, eff_r), calculate_falloff(d1, eff_r),
+                               calculate_falloff(d3, eff_r), calculate_falloff(d4, eff_r)])
+            else:
+                for i in range(1, len(moved_verts) - 1):
+                    v1, v2, v3 = moved_verts[0], moved_verts[i], moved_verts[i + 1]
+                    d1 = min((v1 - center).length, eff_r)
+                    d2 = min((v2 - center).length, eff_r)
+                    d3 = min((v3 - center).length, eff_r)
+                    coords.extend([v1, v2, v3])
+                    colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r),
+                                   calculate_falloff(d3, eff_r)])
+        bt = 'TRIS'
+    else:
+        return None, None, None
+    return coords, colors, bt
@@ -0,0 +1,345 @@
+import numpy as np
+
+
+# ----------------------- 工具函数 -----------------------
+
+def concat_ranges(starts, lengths):
+    """把若干 [start, start + length) 区间拼成一个索引数组"""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def unique_indices(ids, n):
+    """ids 去重并升序：候选较多时用长度 n 的掩码代替排序"""
+    if len(ids) * 16 < n:
+        return np.unique(ids)
+    mask = np.zeros(n, dtype=bool)
+    mask[ids] = True
+    return np.flatnonzero(mask)
+
+
+def build_csr(keys, values, n):
+    """按 keys 分组 values，返回 (indptr, indices)，第 i 组为 indices[indptr[i]:indptr[i + 1]]"""
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    return indptr, np.asarray(values)[order]
+
+
+# ----------------------- 空间索引 -----------------------
+
+class SpatialIndex:
+    """顶点的均匀网格索引，用于软选择的半径查询
+
+    顶点按所在格子排序存放，查询只访问与球体包围盒相交的格子。
+    顶点移动后不重新排序：离开原格子的顶点被标记为失效并放进一个
+    小的溢出列表里线性测试，溢出过多时才整体重建。
+    EDGE/FACE 模式通过顶点到边/面的 CSR 邻接数组由命中的顶点得到候选集。
+    """
+    MAX_DIM = 1024
+    REBUILD_RATIO = 0.05
+
+    def __init__(self, co, edges=None, loop_verts=None, loop_start=None, loop_total=None, cell_size=None):
+        self.co = np.array(co, dtype=np.float32).reshape(-1, 3)
+        self.fixed_cell_size = cell_size
+        self.build()
+        self.set_topology(edges, loop_verts, loop_start, loop_total)
+
+    def __len__(self):
+        return len(self.co)
+
+    # --- 构建 ---
+
+    def build(self):
+        co = self.co
+        n = len(co)
+        if n:
+            lo, hi = co.min(axis=0).astype(np.float64), co.max(axis=0).astype(np.float64)
+        else:
+            lo = hi = np.zeros(3)
+        extent = np.maximum(hi - lo, 1e-6)
+        # 默认平均每个格子几十个顶点
+        self.cell_size = max(self.fixed_cell_size or float(extent.max()) / max(n, 1) ** (1.0 / 3.0), 1e-6)
+        self.origin = lo
+        self.dims = np.clip(np.ceil(extent / self.cell_size).astype(np.int64), 1, self.MAX_DIM)
+
+        self.keys = self._cell_keys(co)
+        self.order = np.argsort(self.keys, kind='stable')
+        self.cell_keys, self.cell_start = np.unique(self.keys[self.order], return_index=True)
+        self.cell_start = np.append(self.cell_start, n).astype(np.int64)
+        self.stale = np.zeros(n, dtype=bool)
+        self.overflow = np.empty(0, dtype=np.int64)
+
+    def set_topology(self, edges=None, loop_verts=None, loop_start=None, loop_total=None, loop_tris=None):
+        """设置边/面数组；与当前数组相同时保留已建好的邻接表
+
+        loop_tris 为按面顺序排列的 (t, 3) 三角形环索引（Mesh.loop_triangles 的布局，
+        每个面 loop_total - 2 个），为 None 时绘制按扇形三角化。
+        """
+        if edges is not None and not (getattr(self, 'edges', None) is not None
+                                      and np.array_equal(edges, self.edges)):
+            self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+            m = len(self.edges)
+            self.vert_edges = build_csr(self.edges.ravel(), np.repeat(np.arange(m), 2), len(self.co))
+        elif not hasattr(self, 'edges'):
+            self.edges = self.vert_edges = None
+
+        if loop_verts is not None and not (getattr(self, 'loop_verts', None) is not None
+                                           and np.array_equal(loop_verts, self.loop_verts)
+                                           and np.array_equal(loop_total, self.loop_total)):
+            self.loop_verts = np.asarray(loop_verts, dtype=np.int64)
+            self.loop_start = np.asarray(loop_start, dtype=np.int64)
+            self.loop_total = np.asarray(loop_total, dtype=np.int64)
+            loop_face = np.repeat(np.arange(len(self.loop_total)), self.loop_total)
+            self.vert_faces = build_csr(self.loop_verts, loop_face, len(self.co))
+        elif not hasattr(self, 'loop_verts'):
+            self.loop_verts = self.loop_start = self.loop_total = self.vert_faces = None
+
+        if loop_tris is not None and self.loop_total is not None:
+            self.loop_tris = np.asarray(loop_tris, dtype=np.int64).reshape(-1, 3)
+            tri_total = self.loop_total - 2
+            self.tri_start = np.cumsum(tri_total) - tri_total
+        elif loop_verts is not None or not hasattr(self, 'loop_tris'):
+            self.loop_tris = self.tri_start = None
+
+    def _cell_keys(self, co):
+        cell = np.floor((co - self.origin) / self.cell_size).astype(np.int64)
+        np.clip(cell, 0, self.dims - 1, out=cell)
+        return cell[:, 0] + self.dims[0] * (cell[:, 1] + self.dims[1] * cell[:, 2])
+
+    # --- 增量更新 ---
+
+    def update(self, co):
+        """用新的顶点坐标更新索引，只处理真正移动过的顶点；返回移动的顶点索引"""
+        co = np.asarray(co, dtype=np.float32).reshape(-1, 3)
+        if len(co) != len(self.co):
+            self.co = co.copy()
+            self.build()
+            return np.arange(len(co))
+
+        moved = np.flatnonzero(np.any(co != self.co, axis=1))
+        if not len(moved):
+            return moved
+        self.co[moved] = co[moved]
+        # self.keys 是构建时的格子；离开它的顶点进入溢出列表，回到原格子的重新生效
+        away = self._cell_keys(self.co[moved]) != self.keys[moved]
+        self.stale[moved] = away
+        self.overflow = np.union1d(np.setdiff1d(self.overflow, moved[~away]), moved[away])
+        if len(self.overflow) > max(256, len(self.co) * self.REBUILD_RATIO):
+            self.build()
+        return moved
+
+    # --- 查询 ---
+
+    def query(self, center, radius, inner=-1.0):
+        """返回 (索引, 距离)：与 center 的距离在 (inner, radius] 之间的顶点
+
+        inner >= 0 时只查询球壳，完全落在内球里的格子直接跳过。
+        """
+        c = np.asarray(center, dtype=np.float64)
+        if not len(self.co):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        lo = np.floor((c - radius - self.origin) / self.cell_size).astype(np.int64)
+        hi = np.floor((c + radius - self.origin) / self.cell_size).astype(np.int64)
+        # 网格外的顶点被夹到边界格子里，所以查询范围同样夹到网格内
+        lo = np.clip(lo, 0, self.dims - 1)
+        hi = np.clip(hi, 0, self.dims - 1)
+        if int(np.prod(hi - lo + 1)) > len(self.cell_keys):
+            # 球比大多数格子都大，直接全量测试更快
+            candidates = np.arange(len(self.co))
+        else:
+            ix, iy, iz = (a.ravel() for a in np.meshgrid(*(np.arange(a, b + 1) for a, b in zip(lo, hi)),
+                                                         indexing='ij'))
+            keys = ix + self.dims[0] * (iy + self.dims[1] * iz)
+            if inner > 0:
+                # 最远角点都在内球里的格子可以跳过；边界格子可能夹着网格外的顶点，保留
+                cell = np.stack((ix, iy, iz), axis=1)
+                cell_lo = self.origin + cell * self.cell_size - c
+                far = np.maximum(np.abs(cell_lo), np.abs(cell_lo + self.cell_size))
+                skip = ((far ** 2).sum(axis=1) <= inner * inner) & np.all((cell > 0) & (cell < self.dims - 1), axis=1)
+                keys = keys[~skip]
+            pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+            pos = pos[self.cell_keys[pos] == keys]
+            starts = self.cell_start[pos]
+            candidates = self.order[concat_ranges(starts, self.cell_start[pos + 1] - starts)]
+            if len(self.overflow):
+                candidates = np.concatenate((candidates[~self.stale[candidates]], self.overflow))
+
+        d2 = ((self.co[candidates] - c) ** 2).sum(axis=1)
+        inside = d2 <= radius * radius
+        if inner >= 0:
+            inside &= d2 > inner * inner
+        return candidates[inside], np.sqrt(d2[inside])
+
+    def near_points(self, seed_co, radius):
+        """与任一种子点距离不超过 radius 的顶点：返回升序的 (顶点, 到最近种子的距离)
+
+        种子建一棵 PointTree。先用本索引的格子中心筛掉离所有种子都太远的格子，
+        只对剩下格子里的顶点做精确的最近点查询。
+        """
+        if not len(self.co) or not len(seed_co):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        seeds = PointTree(seed_co)
+        half_diag = self.cell_size * np.sqrt(3.0) / 2
+        d0, d1 = self.dims[0], self.dims[1]
+        cell = np.stack((self.cell_keys % d0, (self.cell_keys // d0) % d1, self.cell_keys // (d0 * d1)), axis=1)
+        cell_center = self.origin + (cell + 0.5) * self.cell_size
+        near = np.flatnonzero(np.isfinite(seeds.nearest(cell_center, radius + half_diag)))
+
+        starts = self.cell_start[near]
+        candidates = self.order[concat_ranges(starts, self.cell_start[near + 1] - starts)]
+        if len(self.overflow):
+            candidates = np.concatenate((candidates[~self.stale[candidates]], self.overflow))
+        candidates = np.sort(candidates)
+        dist = seeds.nearest(self.co[candidates], radius)
+        inside = np.isfinite(dist)
+        return candidates[inside], dist[inside]
+
+    def geodesic(self, seeds, bound):
+        """沿边的有界最短路径距离：seeds 距离为 0，返回距离不超过 bound 的 (顶点, 距离)
+
+        向量化的标签修正法，每一轮只松弛上一轮距离变小的顶点的邻边，
+        因此只会访问 bound 以内可达的顶点。
+        """
+        indptr, indices = self.vert_edges
+        if getattr(self, '_geo_dist', None) is None or len(self._geo_dist) != len(self.co):
+            self._geo_dist = np.full(len(self.co), np.inf)
+        dist = self._geo_dist
+
+        frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+        dist[frontier] = 0.0
+        reached = [frontier]
+        while len(frontier):
+            counts = indptr[frontier + 1] - indptr[frontier]
+            edges = indices[concat_ranges(indptr[frontier], counts)]
+            src = np.repeat(frontier, counts)
+            dst = self.edges[edges, 0] + self.edges[edges, 1] - src
+            cand = dist[src] + np.sqrt(((self.co[dst] - self.co[src]).astype(np.float64) ** 2).sum(axis=1))
+            better = (cand <= bound) & (cand < dist[dst])
+            dst, cand = dst[better], cand[better]
+            np.minimum.at(dist, dst, cand)
+            frontier = np.unique(dst)
+            reached.append(frontier)
+
+        verts = np.unique(np.concatenate(reached))
+        result = dist[verts].copy()
+        dist[verts] = np.inf  # 复用缓冲，只重置访问过的顶点
+        return verts, result
+
+    def edges_near(self, verts):
+        """与给定顶点相连的所有边（去重、升序）"""
+        indptr, indices = self.vert_edges
+        return unique_indices(indices[concat_ranges(indptr[verts], indptr[verts + 1] - indptr[verts])],
+                              len(self.edges))
+
+    def faces_near(self, verts):
+        """包含给定顶点的所有面（去重、升序）"""
+        indptr, indices = self.vert_faces
+        return unique_indices(indices[concat_ranges(indptr[verts], indptr[verts + 1] - indptr[verts])],
+                              len(self.loop_total))
+
+
+# ----------------------- 最近点 -----------------------
+
+def box_distance2(p, lo, hi):
+    """点到轴对齐盒子的距离的平方，点在盒内为 0"""
+    d = np.maximum(lo - p, 0.0) + np.maximum(p - hi, 0.0)
+    return (d * d).sum(axis=1)
+
+
+class PointTree:
+    """点集的 kd 树，用于一批查询点的有界最近距离
+
+    树是隐式的完全二叉树：每层把每个节点的点沿包围盒最长的轴按中位数分成两半，
+    叶子约 LEAF_SIZE 个点，每层保存各节点的紧包围盒。查询时所有点一起逐层下降，
+    只保留包围盒与“当前最近距离”球相交的 (点, 节点) 对，空白区域整块跳过，
+    因此密集的种子和离种子较远的点都不会展开成点与种子的全配对。
+    (点, 节点) 对超过 MAX_PAIRS 时分块深度优先处理，内存有固定上限。
+    """
+    LEAF_SIZE = 16
+    MAX_PAIRS = 1 << 19
+
+    def __init__(self, co):
+        co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+        m = len(co)
+        self.depth = max(0, int(np.ceil(np.log2(max(m, 1) / self.LEAF_SIZE))))
+        order = np.arange(m)
+        bounds = np.array([0, m], dtype=np.int64)
+        rows = np.arange(m)
+        for _ in range(self.depth):
+            node = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+            pts = co[order]
+            extent = np.maximum.reduceat(pts, bounds[:-1]) - np.minimum.reduceat(pts, bounds[:-1])
+            axis = np.argmax(extent, axis=1)
+            order = order[np.lexsort((pts[rows, axis[node]], node))]
+            split = np.empty(2 * len(bounds) - 1, dtype=np.int64)
+            split[0::2] = bounds
+            split[1::2] = (bounds[:-1] + bounds[1:]) // 2
+            bounds = split
+        self.co = co[order]
+        self.order = order
+        self.leaf_start = bounds
+
+        if m:
+            lo = [np.minimum.reduceat(self.co, bounds[:-1])]
+            hi = [np.maximum.reduceat(self.co, bounds[:-1])]
+            for _ in range(self.depth):
+                lo.append(np.minimum(lo[-1][0::2], lo[-1][1::2]))
+                hi.append(np.maximum(hi[-1][0::2], hi[-1][1::2]))
+            self.lo, self.hi = lo[::-1], hi[::-1]
+
+    def __len__(self):
+        return len(self.co)
+
+    def nearest(self, points, radius):
+        """每个点到最近的树中点的距离，超过 radius 的记为 inf"""
+        p = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        best = np.full(len(p), np.inf)
+        if not len(p) or not len(self.co):
+            return best
+        r2 = float(radius) * radius
+        # 先沿较近的子节点贪心下降到一个叶子，给出初始上界，之后的剪枝才有效
+        pts = np.arange(len(p))
+        node = np.zeros(len(p), dtype=np.int64)
+        for level in range(1, self.depth + 1):
+            left = 2 * node
+            node = left + (box_distance2(p, self.lo[level][left + 1], self.hi[level][left + 1])
+                           < box_distance2(p, self.lo[level][left], self.hi[level][left]))
+        self._leaves(p, pts, node, best)
+        self._descend(p, pts, np.zeros(len(p), dtype=np.int64), 0, r2, best)
+        np.sqrt(best, out=best)
+        best[best > radius] = np.inf
+        return best
+
+    def _descend(self, q, pts, nodes, level, r2, best):
+        """q 为 pts 的坐标，best 为距离平方；保留与球相交的节点，到叶子层时计算点对距离"""
+        keep = box_distance2(q, self.lo[level][nodes], self.hi[level][nodes]) <= np.minimum(best[pts], r2)
+        q, pts, nodes = q[keep], pts[keep], nodes[keep]
+        if level == self.depth:
+            self._leaves(q, pts, nodes, best)
+            return
+        step = max(1, self.MAX_PAIRS // 2)
+        for start in range(0, len(pts), step):
+            chunk = slice(start, start + step)
+            children = (2 * nodes[chunk, None] + np.array([0, 1])).ravel()
+            self._descend(np.repeat(q[chunk], 2, axis=0), np.repeat(pts[chunk], 2), children, level + 1, r2, best)
+
+    def _leaves(self, q, pts, leaves, best):
+        """用叶子里的点更新 best（距离平方）；pts 非降序，q 为其坐标"""
+        step = max(1, self.MAX_PAIRS // self.LEAF_SIZE)
+        for start in range(0, len(pts), step):
+            chunk = slice(start, start + step)
+            counts = self.leaf_start[leaves[chunk] + 1] - self.leaf_start[leaves[chunk]]
+            if not counts.any():
+                continue
+            diff = np.repeat(q[chunk], counts, axis=0) - self.co[concat_ranges(self.leaf_start[leaves[chunk]], counts)]
+            d2 = np.einsum('ij,ij->i', diff, diff)
+            # 同一个点的配对相邻，按点分段取最小值
+            point = np.repeat(pts[chunk], counts)
+            seg = np.flatnonzero(np.diff(point, prepend=-1))
+            hit = point[seg]
+            best[hit] = np.minimum(best[hit], np.minimum.reduceat(d2, seg))
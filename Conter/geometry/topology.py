@@ -0,0 +1,92 @@
+"""网格拓扑：顶点边数、面边统计和拓扑普查
+
+输入是边数组 (m, 2) 和 Mesh.polygons 布局的环数组，只依赖 NumPy。
+"""
+import numpy as np
+
+from .polygons import next_loops
+
+
+def vertex_valence(edges, n_verts):
+    """每个顶点相连的边数"""
+    return np.bincount(edges.ravel(), minlength=n_verts)
+
+
+def face_edge_keys(loop_verts, loop_start, loop_total, n_verts):
+    """每个环与同一面的下一个环组成一条面边，返回 (边键, 使用该边的面数)
+
+    边键为 min * n_verts + max（int64），按升序排列且不重复。
+    """
+    a = loop_verts.astype(np.int64)
+    b = loop_verts[next_loops(loop_start, loop_total)].astype(np.int64)
+    return np.unique(np.minimum(a, b) * n_verts + np.maximum(a, b), return_counts=True)
+
+
+def face_edges(loop_verts, loop_start, loop_total, n_verts):
+    """面用到的所有边，(m, 2) int32"""
+    keys, _ = face_edge_keys(loop_verts, loop_start, loop_total, n_verts)
+    return np.stack((keys // n_verts, keys % n_verts), axis=1).astype(np.int32)
+
+
+class MeshTopology:
+    """一个网格的拓扑统计
+
+    valence: 每个顶点相连的边数
+    boundary_verts: 位于边界边上的顶点掩码
+    poles: 非边界且边数不为 4 的顶点索引（三星点、五星点及以上）
+    """
+
+    def __init__(self, edges, loop_verts, loop_start, loop_total, n_verts, valence=None):
+        if valence is None:
+            valence = vertex_valence(edges, n_verts)
+        n = n_verts
+
+        keys, face_count = face_edge_keys(loop_verts, loop_start, loop_total, n)
+        boundary = keys[face_count == 1]
+
+        self.valence = valence
+        self.boundary_verts = np.zeros(n, dtype=bool)
+        self.boundary_verts[boundary // n] = True
+        self.boundary_verts[boundary % n] = True
+        self.poles = np.flatnonzero(~self.boundary_verts & (valence != 4))
+
+        self.verts = n
+        self.edges = len(edges)
+        self.faces = len(loop_total)
+        self.tris = int(np.count_nonzero(loop_total == 3))
+        self.quads = int(np.count_nonzero(loop_total == 4))
+        self.ngons = int(np.count_nonzero(loop_total > 4))
+        self.boundary_edges = len(boundary)
+        self.non_manifold_edges = int(np.count_nonzero(face_count > 2))
+        self.wire_edges = self.edges - len(keys)  # 不属于任何面的边
+
+    @property
+    def valence_histogram(self):
+        """边数 -> 顶点数"""
+        counts = np.bincount(self.valence)
+        return {int(k): int(c) for k, c in enumerate(counts) if c}
+
+    @property
+    def n_poles(self):
+        return int(np.count_nonzero(self.valence[self.poles] == 3))
+
+    @property
+    def e_poles(self):
+        return int(np.count_nonzero(self.valence[self.poles] >= 5))
+
+    def as_dict(self):
+        return {
+            "verts": self.verts,
+            "edges": self.edges,
+            "faces": self.faces,
+            "tris": self.tris,
+            "quads": self.quads,
+            "ngons": self.ngons,
+            "poles": len(self.poles),
+            "n_poles": self.n_poles,
+            "e_poles": self.e_poles,
+            "boundary_edges": self.boundary_edges,
+            "non_manifold_edges": self.non_manifold_edges,
+            "wire_edges": self.wire_edges,
+            "valence_histogram": self.valence_histogram,
+        }
@@ -71,6 +71,10 @@ def register_keymaps():
     wm = bpy.context.window_manager
     kc = wm.keyconfigs.addon
 
+    # 后台模式下没有插件键位配置
+    if not kc:
+        return
+
     #3D View
     km = kc.keymaps.new(name="3D View", space_type="VIEW_3D")
     if kc:
@@ -78,6 +82,10 @@ def register_keymaps():
         kmi = km.keymap_items.new('wm.modal_operator_pie_r', 'RIGHTMOUSE', 'PRESS')
         addon_keymaps.append((km, kmi))
 
+        #顶点/面显示
+        kmi = km.keymap_items.new('object.vertex_face_display', 'B', 'PRESS', shift=True)
+        addon_keymaps.append((km, kmi))
+
     # Mesh
     km = kc.keymaps.new(name="Mesh", space_type="EMPTY")
     if kc:
@@ -0,0 +1,149 @@
+"""子模块延迟加载
+
+插件启用时只注册轻量的占位操作符和面板，真正的模块（及其依赖的 numpy、gpu 等）
+在第一次调用其操作符或第一次绘制其面板时才导入并注册，随后占位类被替换掉。
+设置环境变量 CONTER_EAGER_LOAD=1 时在注册时直接加载全部模块。
+"""
+import bpy
+import importlib
+import os
+import time
+from functools import partial
+
+
+EAGER = bool(os.environ.get("CONTER_EAGER_LOAD"))
+
+
+# ----------------------- 占位类 -----------------------
+
+def stub_operator(lazy, idname, label):
+    """与真实操作符同名的占位操作符：调用时加载模块，下一个计时器周期再调用真实操作符"""
+    def invoke(self, context, event):
+        lazy.defer_call(idname, context)
+        return {'FINISHED'}
+
+    def execute(self, context):
+        lazy.defer_call(idname, context)
+        return {'FINISHED'}
+
+    return type("CONTER_OT_stub_" + idname.replace(".", "_"), (bpy.types.Operator,), {
+        "bl_idname": idname,
+        "bl_label": label,
+        "invoke": invoke,
+        "execute": execute,
+    })
+
+
+def stub_panel(lazy, idname, label, space_type, region_type, **attrs):
+    """与真实面板位置相同的占位面板：第一次绘制时安排加载模块"""
+    def draw(self, context):
+        self.layout.label(text="正在加载…", icon='TIME')
+        lazy.defer_load()
+
+    return type(idname, (bpy.types.Panel,), dict(attrs, **{
+        "bl_idname": idname,
+        "bl_label": label,
+        "bl_space_type": space_type,
+        "bl_region_type": region_type,
+        "draw": draw,
+    }))
+
+
+def tag_redraw_all():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            area.tag_redraw()
+
+
+# ----------------------- 延迟模块 -----------------------
+
+class LazyModule:
+    """一个延迟加载的子模块
+
+    operators: (bl_idname, bl_label) 列表，注册同名占位操作符，快捷键和菜单可以直接引用
+    panels: (bl_idname, bl_label, bl_space_type, bl_region_type, 其他属性) 列表
+    scene_properties: 其他模块在加载前就会读取的场景属性，由本层注册
+    """
+
+    def __init__(self, package, name, operators=(), panels=(), scene_properties=None):
+        self.package = package
+        self.name = name
+        self.operators = operators
+        self.panels = panels
+        self.scene_properties = scene_properties or {}
+        self.stubs = []
+        self.module = None
+        self.load_time = 0.0
+        # bpy.app.timers 按函数对象判断是否已注册，需保留同一个绑定方法
+        self.load_timer = self._load_timer
+
+    @property
+    def loaded(self):
+        return self.module is not None
+
+    def register(self):
+        for prop, value in self.scene_properties.items():
+            setattr(bpy.types.Scene, prop, value)
+        if EAGER:
+            self.load()
+            return
+        self.stubs = [stub_operator(self, idname, label) for idname, label in self.operators]
+        self.stubs += [stub_panel(self, idname, label, space, region, **attrs)
+                       for idname, label, space, region, attrs in self.panels]
+        for cls in self.stubs:
+            bpy.utils.register_class(cls)
+
+    def unregister(self):
+        if bpy.app.timers.is_registered(self.load_timer):
+            bpy.app.timers.unregister(self.load_timer)
+        if self.module is not None:
+            self.module.unregister()
+            self.module = None
+        self.unregister_stubs()
+        for prop in self.scene_properties:
+            if hasattr(bpy.types.Scene, prop):
+                delattr(bpy.types.Scene, prop)
+
+    def unregister_stubs(self):
+        for cls in reversed(self.stubs):
+            bpy.utils.unregister_class(cls)
+        self.stubs.clear()
+
+    def load(self):
+        """导入并注册真实模块，替换占位类"""
+        if self.module is None:
+            start = time.perf_counter()
+            self.unregister_stubs()
+            module = importlib.import_module(f"{self.package}.{self.name}")
+            module.register()
+            self.module = module
+            self.load_time = time.perf_counter() - start
+        return self.module
+
+    def defer_load(self):
+        """在面板绘制中不能注册类，交给计时器加载"""
+        if not bpy.app.timers.is_registered(self.load_timer):
+            bpy.app.timers.register(self.load_timer, first_interval=0.0)
+
+    def _load_timer(self):
+        if self.module is None:
+            self.load()
+            tag_redraw_all()
+        return None
+
+    def defer_call(self, idname, context):
+        """占位操作符运行时不能注销自身，加载和重新调用都放到计时器里"""
+        call = partial(self._call_timer, idname, context.window, context.area, context.region)
+        bpy.app.timers.register(call, first_interval=0.0)
+
+    def _call_timer(self, idname, window, area, region):
+        self.load()
+        category, name = idname.split(".")
+        op = getattr(getattr(bpy.ops, category), name)
+        try:
+            with bpy.context.temp_override(window=window, area=area, region=region):
+                op('INVOKE_DEFAULT')
+        except (ReferenceError, RuntimeError, TypeError) as e:
+            # 调用前窗口或区域已被关闭
+            print(f"调用 {idname} 失败: {e}")
+        return None
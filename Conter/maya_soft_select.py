@@ -1,16 +1,76 @@
 import bpy
 import bmesh
 import math
+import os
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from mathutils import Vector
 import gpu
 import bgl
 from gpu_extras.batch import batch_for_shader
 import blf
 
+from .mesh_cache import get_snapshot, mesh_fingerprint
+from .shaders import get_shader
+from .geometry.reference import get_draw_data, get_selection_center
+
+try:
+    import numpy as np
+    from .geometry.falloff import (RadiusRing, SelectionAccumulator, get_draw_data_geodesic,
+                                   get_draw_data_nearest)
+    from .geometry.spatial_index import SpatialIndex
+except ImportError:  # 没有 numpy 时退回逐元素计算
+    np = None
+
 
 # ----------------------- 全局数据 -----------------------
 
+class RecomputeCounter:
+    """统计叠加层的重算次数，rate() 为最近一秒内的次数"""
+    WINDOW = 1.0
+
+    def __init__(self):
+        self.times = deque()
+        self.total = 0
+
+    def _trim(self, now):
+        while self.times and now - self.times[0] > self.WINDOW:
+            self.times.popleft()
+
+    def tick(self):
+        now = time.perf_counter()
+        self.times.append(now)
+        self.total += 1
+        self._trim(now)
+
+    def rate(self):
+        self._trim(time.perf_counter())
+        return len(self.times) / self.WINDOW
+
+
+class ObjectOverlay:
+    """一个编辑中物体的叠加层：空间索引、衰减环和 GPU 批次，都在物体空间中"""
+
+    def __init__(self):
+        # 每个编辑会话构建一次的空间索引及其对应的几何键（只改变选择时不变）
+        self.spatial_index = None
+        self.index_mesh = None
+        self.index_key = None
+        self.topology_key = None
+        # 选中顶点的坐标和与数量，随选择差异增量更新
+        self.accumulator = SelectionAccumulator() if np is not None else None
+        self.radius_ring = None
+        # 缓存的 GPU 批次，只在网格/半径/选择模式变化时重建
+        self.batch = None
+        self.vbo = None
+        self.batch_key = None
+        # GPU 衰减着色：缓冲里已上传到 batch_reach（世界空间）为止的元素，半径只作为 uniform
+        self.batch_reach = -1.0
+        self.center = None  # 物体空间中的衰减中心
+        self.scale = 1.0  # 世界距离与物体空间距离之比
+
+
 class SoftSelectionData:
     _instance = None
     MAIN = 0
@@ -34,16 +94,28 @@ class SoftSelectionData:
         self.overlay_handler = None
         self.text_handler = None
         self.draw_mode = 'VERT'
+        # 'CENTER'：到选择中心的距离（半径加上 max_d）；'NEAREST'：到最近选中顶点的距离
+        self.distance_mode = 'CENTER'
         self.locked_selection = None
+        # 脏标记：选择模式等输入变化时置位，绘制时重算一次后清除。
+        # 网格编辑经 depsgraph 更新后体现为快照指纹变化，半径变化由 batch_key/batch_reach 判断
         self.update_draw = True
+        self.msgbus_owner = None
+        self.recomputes = RecomputeCounter()
+        self.shown_rate = None
         self.state = self.MAIN
         self.center = Vector()
         self.radius = 0.0
         self.prev_radius = 0.0
         self.b_release_time = 0.0
-        self.affected_faces = []
-        self.last_draw_time = 0
-        self.prev_viewport_matrix = None
+        # 所有编辑中物体选中顶点的世界空间中心
+        self.center_cache = None
+        self.falloff_center = None
+        self.max_d = 0.0
+        # 物体名 -> ObjectOverlay
+        self.overlays = {}
+        # 写过标题的区域（as_pointer -> Area），计时器只刷新、退出时只清除这些
+        self.header_areas = {}
 
     @classmethod
     def get(cls):
@@ -52,134 +124,259 @@ class SoftSelectionData:
         return cls._instance
 
 
-# ----------------------- 着色器配置 -----------------------
-
-vert_shader = '''
-uniform mat4 ModelViewProjectionMatrix;
-uniform mat4 ObjectMatrix;
-in vec3 position;
-in vec4 color;
-out vec4 vColor;
-void main(){
-    gl_Position = ModelViewProjectionMatrix * ObjectMatrix * vec4(position, 1.0);
-    vColor = color;
-}
-'''
-
-frag_shader = '''
-in vec4 vColor;
-out vec4 FragColor;
-void main(){
-    FragColor = vColor;
-}
-'''
-
-shader = gpu.types.GPUShader(vert_shader, frag_shader)
-
-
-# ----------------------- 工具函数 -----------------------
-
-def get_selection_center(bm):
-    verts = [v for v in bm.verts if v.select]
-    if not verts:
-        return None, 0.0
-    center = sum((v.co for v in verts), Vector()) / len(verts)
-    max_d = max((v.co - center).length for v in verts)
-    return center, max_d
-
-
-def calculate_falloff(d, r):
-    t = d / r
-    if t < 0.25:
-        color = (1, t * 4, 0, 0.8 + 0.2 * (1 - t))
-    elif t < 0.5:
-        color = (1 - (t - 0.25) * 4, 1, 0, 0.8 + 0.2 * (1 - t))
-    elif t < 0.75:
-        color = (0, 1 - (t - 0.5) * 4, 0, 0.8 + 0.2 * (1 - t))
-    else:
-        gray = 1 - (t - 0.75) * 4
-        color = (gray * 0.2, gray * 0.3, gray * 0.2, 0.8 + 0.2 * (1 - t))
-    return color
-
-
-def get_draw_data(bm, center, eff_r, mode, data):
-    coords, colors = [], []
-    if mode == 'VERT':
-        for v in bm.verts:
-            if (v.co - center).length_squared <= eff_r ** 2:
-                d = (v.co - center).length
-                coords.append(v.co)
-                colors.append(calculate_falloff(d, eff_r))
-        bt = 'POINTS'
-    elif mode == 'EDGE':
-        for e in bm.edges:
-            v1, v2 = e.verts
-            if (v1.co - center).length_squared <= eff_r ** 2 or (v2.co - center).length_squared <= eff_r ** 2:
-                d1 = min((v1.co - center).length, eff_r)
-                d2 = min((v2.co - center).length, eff_r)
-                coords.extend([v1.co, v2.co])
-                colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r)])
-        bt = 'LINES'
-    elif mode == 'FACE':
-        data.affected_faces = []
-        for f in bm.faces:
-            if any((v.co - center).length_squared <= eff_r ** 2 for v in f.verts):
-                data.affected_faces.append(f)
-
-        face_data = {}
-        for f in data.affected_faces:
-            face_center = sum((v.co for v in f.verts), Vector()) / len(f.verts)
-            moved_verts = [v.co + (face_center - v.co) * 0.05 for v in f.verts]
-            face_data[f] = (face_center, moved_verts)
-
-        for f, (face_center, moved_verts) in face_data.items():
-            if len(moved_verts) == 3:
-                for v_moved in moved_verts:
-                    d = min((v_moved - center).length, eff_r)
-                    coords.append(v_moved)
-                    colors.append(calculate_falloff(d, eff_r))
-            elif len(moved_verts) == 4:
-                v1, v2, v3, v4 = moved_verts
-                d1 = min((v1 - center).length, eff_r)
-                d2 = min((v2 - center).length, eff_r)
-                d3 = min((v3 - center).length, eff_r)
-                d4 = min((v4 - center).length, eff_r)
-                coords.extend([v1, v2, v3, v1, v3, v4])
-                colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r),
-                               calculate_falloff(d3, eff_r), calculate_falloff(d1, eff_r),
-                               calculate_falloff(d3, eff_r), calculate_falloff(d4, eff_r)])
-            else:
-                for i in range(1, len(moved_verts) - 1):
-                    v1, v2, v3 = moved_verts[0], moved_verts[i], moved_verts[i + 1]
-                    d1 = min((v1 - center).length, eff_r)
-                    d2 = min((v2 - center).length, eff_r)
-                    d3 = min((v3 - center).length, eff_r)
-                    coords.extend([v1, v2, v3])
-                    colors.extend([calculate_falloff(d1, eff_r), calculate_falloff(d2, eff_r),
-                                   calculate_falloff(d3, eff_r)])
-        bt = 'TRIS'
-    else:
-        return None, None, None
-    return coords, colors, bt
+# ----------------------- 批次 -----------------------
+
+# 重建缓冲时多上传一截，半径在这个范围内变化只需更新 uniform
+FALLOFF_HEADROOM = 1.5
+
+
+def build_overlay_batch(coords, colors, bt):
+    """把绘制数据上传成持久的 GPUBatch，返回 (batch, vbo)"""
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="position", comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="color", comp_type='F32', len=4, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(fmt, len(coords))
+    vbo.attr_fill(id="position", data=coords)
+    vbo.attr_fill(id="color", data=colors)
+    return gpu.types.GPUBatch(type=bt, buf=vbo), vbo
+
+
+def build_falloff_batch(coords, keys, bt):
+    """只含位置和元素距离的批次，颜色由 FALLOFF 着色器计算"""
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="position", comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="key", comp_type='F32', len=1, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(fmt, len(coords))
+    vbo.attr_fill(id="position", data=coords)
+    vbo.attr_fill(id="key", data=keys)
+    return gpu.types.GPUBatch(type=bt, buf=vbo), vbo
+
+
+# ----------------------- NumPy 批量计算 -----------------------
+
+def ensure_spatial_index(snap, data, mode):
+    """返回与网格快照同步的空间索引：会话内只构建一次，网格编辑后增量更新"""
+    index = data.spatial_index
+    if index is None or data.index_mesh != snap.mesh_name or len(index) != len(snap.co):
+        index = data.spatial_index = SpatialIndex(snap.co)
+        data.index_mesh = snap.mesh_name
+        data.topology_key = None
+    elif data.index_key != snap.geometry_key:
+        index.update(snap.co)
+    data.index_key = snap.geometry_key
+
+    # EDGE 模式和表面距离只用边；面数组和 loop_tris（编辑模式中要三角化整个网格）只在 FACE 模式读取。
+    # topology_key 记下同步到的几何和是否包含面
+    faces = mode == 'FACE'
+    if mode in {'EDGE', 'FACE'} and data.topology_key not in {(snap.geometry_key, True), (snap.geometry_key, faces)}:
+        if faces:
+            index.set_topology(snap.edges, snap.loop_verts, snap.loop_start, snap.loop_total, snap.loop_tris)
+        else:
+            index.set_topology(snap.edges)
+        data.topology_key = (snap.geometry_key, faces)
+    return index
 
 
-def calc_locked_selection(context, bm, mode, radius):
-    center, max_d = get_selection_center(bm)
-    if center is None:
-        return None, None, 0.0
-    eff_r = max_d + radius
+def sync_accumulator(snap, holder):
+    """让 holder 的选择累加器跟上快照：几何不变时只累加选择的差异，否则整体重算一次"""
+    holder.accumulator.update(snap.co, snap.selected, snap.select_key)
+    return holder.accumulator
+
+
+def get_radius_ring(index, center, mode, data):
+    """中心、网格和模式不变时复用 data.radius_ring"""
+    key = (id(index), data.index_key, tuple(center), mode)
+    if data.radius_ring is None or data.radius_ring.key != key:
+        data.radius_ring = RadiusRing(index, center, mode, key)
+    return data.radius_ring
+
+
+# 以下 build_* 以网格快照为输入，只做 NumPy 计算，可以在工作线程中运行；
+# 快照数组须先在主线程中读取（见 prepare_snapshot），holder 为保存缓存的 ObjectOverlay
+
+def build_geodesic_draw_data(snap, radius, mode, holder):
+    index = ensure_spatial_index(snap, holder, 'EDGE' if mode == 'VERT' else mode)
+    return get_draw_data_geodesic(index, snap.selected, radius, mode)
+
+
+def build_nearest_draw_data(snap, radius, mode, holder):
+    index = ensure_spatial_index(snap, holder, mode)
+    return get_draw_data_nearest(index, snap.selected, radius, mode)
+
+
+def build_falloff_positions(snap, center, reach, mode, holder):
+    """GPU 衰减着色用的位置缓冲：reach 以内的元素坐标及其距离键"""
+    ring = get_radius_ring(ensure_spatial_index(snap, holder, mode), center, mode, holder)
+    return ring.positions(reach)
+
+
+# ----------------------- 多物体编辑 -----------------------
+
+def edit_mesh_objects(context):
+    """编辑模式中的所有网格物体；没有 numpy 时只处理活动物体"""
+    if np is None:
+        obj = context.edit_object
+        return [obj] if obj and obj.type == 'MESH' else []
+    return [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+
+
+def get_overlay(data, obj):
+    overlay = data.overlays.get(obj.name_full)
+    if overlay is None:
+        overlay = data.overlays[obj.name_full] = ObjectOverlay()
+    return overlay
+
+
+def matrix_scale(obj):
+    """物体矩阵的平均缩放：世界空间的距离除以它即为物体空间的距离，均匀缩放时是精确的"""
+    scale = obj.matrix_world.to_scale()
+    return max((abs(scale.x) + abs(scale.y) + abs(scale.z)) / 3, 1e-12)
+
+
+def build_world_center(objs, data):
+    """所有编辑中物体选中顶点的世界空间中心和最大距离，按快照指纹和物体矩阵缓存"""
+    if np is None:
+        obj = objs[0]
+        center, max_d = get_selection_center(bmesh.from_edit_mesh(obj.data))
+        if center is None:
+            return None, 0.0
+        return obj.matrix_world @ center, max_d * matrix_scale(obj)
+
+    snaps = [get_snapshot(obj) for obj in objs]
+    key = tuple((obj.name_full, snap.fingerprint, tuple(map(tuple, obj.matrix_world)))
+                for obj, snap in zip(objs, snaps))
+    if data.center_cache is None or data.center_cache[0] != key:
+        # 各物体的累加器在物体空间中，坐标和经矩阵变换后相加：sum(M @ p) = R @ sum(p) + t * count
+        parts = [(sync_accumulator(snap, get_overlay(data, obj)), np.array(obj.matrix_world))
+                 for obj, snap in zip(objs, snaps)]
+        count = sum(acc.count for acc, _ in parts)
+        if not count:
+            data.center_cache = (key, None, 0.0)
+        else:
+            world_sum = sum(m[:3, :3] @ acc.sum + m[:3, 3] * acc.count for acc, m in parts)
+            center = world_sum / count
+            max_d = max(acc.max_distance(center, m) for acc, m in parts)
+            data.center_cache = (key, Vector(center), max_d)
+    return data.center_cache[1], data.center_cache[2]
+
+
+def sync_selection():
+    """计时器：点击选择之后立即按差异更新各物体的选择累加器，调整半径时中心已是最新的"""
+    data = SoftSelectionData.get()
+    if np is None or data.overlay_handler is None:
+        return None
+    for obj in bpy.context.view_layer.objects:
+        if obj.type == 'MESH' and obj.mode == 'EDIT' and obj.name_full in data.overlays:
+            sync_accumulator(get_snapshot(obj), data.overlays[obj.name_full])
+    return None
+
+
+def prepare_snapshot(snap, mode, distance):
+    """主线程：读取工作线程要用到的快照数组，bmesh 不能跨线程访问"""
+    snap.co
+    snap.selected
+    if mode in {'EDGE', 'FACE'} or distance == 'SURFACE':
+        snap.edges
+    if mode == 'FACE':
+        snap.loop_verts
+        snap.loop_start
+        snap.loop_total
+        snap.loop_tris
+    return snap
+
+
+def compute_overlay(snap, overlay, mode, distance, radius, reach):
+    """工作线程：一个物体在物体空间中的绘制数据，radius/reach 为世界空间距离"""
+    if distance == 'SURFACE':
+        return build_geodesic_draw_data(snap, radius / overlay.scale, mode, overlay)
+    if distance == 'NEAREST':
+        return build_nearest_draw_data(snap, radius / overlay.scale, mode, overlay)
+    return build_falloff_positions(snap, overlay.center, reach / overlay.scale, mode, overlay)
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1),
+                                       thread_name_prefix="soft_select")
+    return _executor
+
+
+def run_jobs(func, jobs):
+    """多个物体时把 NumPy 计算分给线程池，单个物体直接在主线程中计算"""
+    if len(jobs) == 1:
+        return [func(*jobs[0])]
+    return list(get_executor().map(lambda job: func(*job), jobs))
+
+
+# ----------------------- 输入订阅 -----------------------
+
+def tag_redraw_view3d():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def on_select_mode_changed():
+    SoftSelectionData.get().update_draw = True
+    tag_redraw_view3d()
+
+
+def on_connected_changed():
+    """切换“仅相连”会改变实际的距离模式，标题也要跟着变"""
     data = SoftSelectionData.get()
-    locked = get_draw_data(bm, center, eff_r, mode, data)
-    return locked, center, max_d
+    data.update_draw = True
+    refresh_headers(data)
+    tag_redraw_view3d()
+
+
+def on_radius_changed():
+    # 是否需要重算由绘制时的 batch_key/batch_reach 决定，GPU 衰减路径通常只需更新 uniform
+    tag_redraw_view3d()
+
+
+def subscribe_inputs(data):
+    """订阅影响叠加层的工具设置，变化时置脏标记并请求重绘"""
+    data.msgbus_owner = object()
+    for prop, notify in (("proportional_size", on_radius_changed),
+                         ("proportional_distance", on_radius_changed),
+                         ("mesh_select_mode", on_select_mode_changed),
+                         ("use_proportional_connected", on_connected_changed)):
+        bpy.msgbus.subscribe_rna(key=(bpy.types.ToolSettings, prop), owner=data.msgbus_owner,
+                                 args=(), notify=notify)
+
+
+def unsubscribe_inputs(data):
+    if data.msgbus_owner is not None:
+        bpy.msgbus.clear_by_owner(data.msgbus_owner)
+        data.msgbus_owner = None
+
+
+STATS_INTERVAL = 1.0
+
+
+def refresh_stats():
+    """计时器：重算频率变化时刷新标题栏"""
+    data = SoftSelectionData.get()
+    if data.overlay_handler is None:
+        return None
+    if data.recomputes.rate() != data.shown_rate:
+        refresh_headers(data)
+    return STATS_INTERVAL
 
 
 # ----------------------- 绘制功能 -----------------------
 
 def draw_soft_selection(context):
-    obj = context.edit_object
-    if not obj or obj.type != 'MESH' or context.mode != 'EDIT_MESH':
+    if context.mode != 'EDIT_MESH':
+        return
+    objs = edit_mesh_objects(context)
+    if not objs:
         return
-    bm = bmesh.from_edit_mesh(obj.data)
     data = SoftSelectionData.get()
 
     select_mode = context.tool_settings.mesh_select_mode
@@ -190,35 +387,85 @@ def draw_soft_selection(context):
     elif select_mode[2]:
         data.draw_mode = 'FACE'
 
-    current_viewport_matrix = context.region_data.perspective_matrix.copy()
-    if data.prev_viewport_matrix is None or current_viewport_matrix != data.prev_viewport_matrix:
-        data.update_draw = True
-        data.prev_viewport_matrix = current_viewport_matrix
-
-    current_time = time.time()
-    if data.draw_mode == 'FACE' or (data.update_draw and current_time - data.last_draw_time > 0.1):
-        center, max_d = get_selection_center(bm)
-        if center is None:
-            return
-        if data.state == data.ADJUSTING:
-            eff_r = max_d + get_proportional_distance(data.radius)
-        else:
-            eff_r = max_d + context.scene.tool_settings.proportional_size
-        coords, colors, bt = get_draw_data(bm, center, eff_r, data.draw_mode, data)
-        data.draw_data = (coords, colors, bt)
-        data.update_draw = False
-        data.last_draw_time = current_time
+    if data.state == data.ADJUSTING:
+        radius = get_proportional_distance(data.radius)
     else:
-        if not hasattr(data, 'draw_data') or data.draw_data is None:
-            return
-        coords, colors, bt = data.draw_data
+        radius = context.scene.tool_settings.proportional_size
+
+    distance = active_distance_mode(context.scene, data)
+    gpu_falloff = distance == 'CENTER' and np is not None
 
-    if coords:
-        batch = batch_for_shader(shader, bt, {"position": coords, "color": colors})
-        shader.bind()
-        shader.uniform_float("ModelViewProjectionMatrix", context.region_data.perspective_matrix)
-        shader.uniform_float("ObjectMatrix", obj.matrix_world)
-        batch.draw(shader)
+    # 离开编辑模式的物体不再绘制
+    names = {obj.name_full for obj in objs}
+    for name in [name for name in data.overlays if name not in names]:
+        del data.overlays[name]
+
+    # 中心取所有物体选中顶点的世界空间中心；表面/最近点距离在各物体内部计算
+    center, max_d = build_world_center(objs, data)
+    if center is None:
+        for overlay in data.overlays.values():
+            overlay.batch = overlay.vbo = overlay.batch_key = None
+        return
+    data.falloff_center = center
+    data.max_d = max_d
+    eff_r = max_d + radius
+
+    # 叠加层在物体空间中，视角变化不影响它；只有网格内容（指纹）、选择模式、中心变化，
+    # 或半径超出已上传的范围时才需要重算，并且只重算受影响的物体
+    dirty = data.update_draw
+    data.update_draw = False
+    jobs = []
+    for obj in objs:
+        overlay = get_overlay(data, obj)
+        overlay.scale = matrix_scale(obj)
+        local_center = obj.matrix_world.inverted_safe() @ center
+        batch_key = (mesh_fingerprint(obj.data), data.draw_mode, distance, overlay.scale)
+        if distance == 'CENTER':
+            batch_key += (tuple(local_center),)
+        if not gpu_falloff:
+            # 颜色在 CPU 上算好的路径，半径变化也要重建
+            batch_key += (radius,)
+        if (dirty or batch_key != overlay.batch_key
+                or (gpu_falloff and eff_r > overlay.batch_reach)):
+            overlay.batch = overlay.vbo = None
+            overlay.batch_key = batch_key
+            overlay.center = local_center
+            jobs.append((obj, overlay))
+
+    if jobs:
+        data.recomputes.tick()
+        reach = eff_r * FALLOFF_HEADROOM
+        if np is None:
+            obj, overlay = jobs[0]
+            results = [get_draw_data(bmesh.from_edit_mesh(obj.data), overlay.center,
+                                     eff_r / overlay.scale, data.draw_mode)]
+        else:
+            results = run_jobs(compute_overlay, [
+                (prepare_snapshot(get_snapshot(obj), data.draw_mode, distance), overlay,
+                 data.draw_mode, distance, radius, reach)
+                for obj, overlay in jobs])
+        # GPU 缓冲只能在主线程中上传
+        for (obj, overlay), (coords, attr, bt) in zip(jobs, results):
+            overlay.batch_reach = reach if gpu_falloff else -1.0
+            if coords is None or not len(coords):
+                continue
+            if gpu_falloff:
+                overlay.batch, overlay.vbo = build_falloff_batch(coords, attr, bt)
+            else:
+                overlay.batch, overlay.vbo = build_overlay_batch(coords, attr, bt)
+
+    draw_shader = get_shader('FALLOFF' if gpu_falloff else 'OBJECT_COLOR')
+    draw_shader.bind()
+    draw_shader.uniform_float("ModelViewProjectionMatrix", context.region_data.perspective_matrix)
+    for obj in objs:
+        overlay = data.overlays[obj.name_full]
+        if overlay.batch is None:
+            continue
+        draw_shader.uniform_float("ObjectMatrix", obj.matrix_world)
+        if gpu_falloff:
+            draw_shader.uniform_float("center", overlay.center)
+            draw_shader.uniform_float("radius", eff_r / overlay.scale)
+        overlay.batch.draw(draw_shader)
 
 
 def draw_radius_ring(context):
@@ -227,10 +474,8 @@ def draw_radius_ring(context):
         return
     region = context.region
     rv3d = context.region_data
-    obj = context.edit_object
-    center_3d = data.center
-    center_3d = obj.matrix_world @ center_3d
-    center_2d = _3d_to_2d(region, rv3d, center_3d)
+    # data.center 是所有编辑中物体的世界空间中心
+    center_2d = _3d_to_2d(region, rv3d, data.center)
 
     if not center_2d:
         return
@@ -246,7 +491,10 @@ def draw_radius_ring(context):
     batch.draw(shader)
     gpu.state.blend_set('NONE')
 
-    bpy.context.scene.tool_settings.proportional_distance = get_proportional_distance(data.radius)
+    # 相同的值不再写回，否则每帧都会触发 proportional_distance 的订阅
+    distance = get_proportional_distance(data.radius)
+    if bpy.context.scene.tool_settings.proportional_distance != distance:
+        bpy.context.scene.tool_settings.proportional_distance = distance
 
 
 def draw_text_callback(context):
@@ -289,17 +537,58 @@ def get_proportional_distance(radius):
 
 # ----------------------- 操作符辅助函数 -----------------------
 
+def active_distance_mode(scene, data):
+    """实际使用的距离模式：“仅相连”时按表面（沿边）距离，与 Blender 的 Connected Only 衰减一致"""
+    if np is None:
+        return 'CENTER'
+    if scene.tool_settings.use_proportional_connected:
+        return 'SURFACE'
+    return data.distance_mode
+
+
+DISTANCE_LABELS = {'CENTER': "中心", 'NEAREST': "最近点", 'SURFACE': "表面"}
+
+
 def update_header(context, data):
+    """context 可以是操作符的上下文，也可以直接是要设置标题的区域"""
+    area = getattr(context, "area", context)
     state_text = "主状态" if data.state == data.MAIN else "调整状态"
-    header = f"Maya软选择 | 状态：{state_text} | 模式：{'选择'} | 网格模式：{data.draw_mode} | [1]点 [2]边 [3]面"
-    context.area.header_text_set(header)
+    distance_text = DISTANCE_LABELS[active_distance_mode(bpy.context.scene, data)]
+    data.shown_rate = data.recomputes.rate()
+    header = (f"Maya软选择 | 状态：{state_text} | 模式：{'选择'} | 网格模式：{data.draw_mode} | "
+              f"距离：{distance_text} | 重算 {data.shown_rate:.0f} 次/秒（共 {data.recomputes.total}）| "
+              f"[1]点 [2]边 [3]面 [D]距离")
+    area.header_text_set(header)
+    data.header_areas[area.as_pointer()] = area
+
+
+def refresh_headers(data):
+    """重写所有写过的标题"""
+    for key, area in list(data.header_areas.items()):
+        try:
+            update_header(area, data)
+        except ReferenceError:
+            # 区域已随屏幕布局变化被释放
+            del data.header_areas[key]
+
+
+def clear_headers(data):
+    """清除所有写过的标题"""
+    for area in data.header_areas.values():
+        try:
+            area.header_text_set(None)
+            area.tag_redraw()
+        except ReferenceError:
+            pass
+    data.header_areas.clear()
 
 
 def init_adjustment(context, event, data, reset_radius=True):
-    obj = context.edit_object
-    bm = bmesh.from_edit_mesh(obj.data)
-    data.center = get_selection_center(bm)[0]
-    if not data.center:
+    objs = edit_mesh_objects(context)
+    if not objs:
+        return False
+    data.center = build_world_center(objs, data)[0]
+    if data.center is None:
         return False
 
     data.drag_start_pos = Vector((event.mouse_region_x, event.mouse_region_y))
@@ -315,10 +604,8 @@ def init_adjustment(context, event, data, reset_radius=True):
 def update_radius(context, event, data):
     region = context.region
     rv3d = context.region_data
-    obj = context.edit_object
-    center_3d = data.center
-    center_3d = obj.matrix_world @ center_3d
-    center_2d = _3d_to_2d(region, rv3d, center_3d)
+    # data.center 是所有编辑中物体的世界空间中心
+    center_2d = _3d_to_2d(region, rv3d, data.center)
 
     if not center_2d:
         print("Warning: Failed to calculate 2D center for radius update.")
@@ -338,7 +625,6 @@ def update_radius(context, event, data):
             new_radius = data.radius + min_increase
         data.radius += (new_radius - data.radius) * 0.1
 
-    data.update_draw = True
     context.area.tag_redraw()
 
 
@@ -423,8 +709,17 @@ class VIEW3D_OT_MaYa_soft_selection(bpy.types.Operator):
                 self.data.update_draw = True
                 context.area.tag_redraw()
                 return {'RUNNING_MODAL'}
+            elif event.type == 'D':
+                self.data.distance_mode = 'NEAREST' if self.data.distance_mode == 'CENTER' else 'CENTER'
+                self.data.update_draw = True
+                update_header(context, self.data)
+                context.area.tag_redraw()
+                return {'RUNNING_MODAL'}
         if event.type in {'LEFTMOUSE', 'SELECT'}:
-            self.data.update_draw = True
+            # 选择变化经 depsgraph 更新体现为快照指纹变化，这里不必置脏；
+            # 选择操作符在本事件之后运行，下一轮再按选择差异更新累加器
+            if event.value == 'PRESS' and not bpy.app.timers.is_registered(sync_selection):
+                bpy.app.timers.register(sync_selection, first_interval=0.0)
             return {'PASS_THROUGH'}
 
         result = update_data_state(context, event, self.data, self.db_time)
@@ -471,6 +766,10 @@ class VIEW3D_OT_MaYa_soft_selection(bpy.types.Operator):
             if not self.data.overlay_handler:
                 self.data.overlay_handler = bpy.types.SpaceView3D.draw_handler_add(draw_soft_selection, (context,),
                                                                                    'WINDOW', 'POST_VIEW')
+            unsubscribe_inputs(self.data)
+            subscribe_inputs(self.data)
+            if not bpy.app.timers.is_registered(refresh_stats):
+                bpy.app.timers.register(refresh_stats, first_interval=STATS_INTERVAL)
             update_header(context, self.data)
             context.window_manager.modal_handler_add(self)
             print("execute 方法执行成功")
@@ -481,6 +780,10 @@ class VIEW3D_OT_MaYa_soft_selection(bpy.types.Operator):
 
     def cancel(self, context):
         context.scene.tool_settings.use_proportional_edit = False
+        unsubscribe_inputs(self.data)
+        for timer in (refresh_stats, sync_selection):
+            if bpy.app.timers.is_registered(timer):
+                bpy.app.timers.unregister(timer)
         if self.data.overlay_handler:
             bpy.types.SpaceView3D.draw_handler_remove(self.data.overlay_handler, 'WINDOW')
             self.data.overlay_handler = None
@@ -490,8 +793,8 @@ class VIEW3D_OT_MaYa_soft_selection(bpy.types.Operator):
         if self.data.text_handler:
             bpy.types.SpaceView3D.draw_handler_remove(self.data.text_handler, 'WINDOW')
             self.data.text_handler = None
+        clear_headers(self.data)
         self.data.reset()
-        context.area.header_text_set(None)
         context.area.tag_redraw()
 
 
@@ -506,6 +809,15 @@ def register():
 
 
 def unregister():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    unsubscribe_inputs(SoftSelectionData.get())
+    clear_headers(SoftSelectionData.get())
+    for timer in (refresh_stats, sync_selection):
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
     try:
         bpy.utils.unregister_class(VIEW3D_OT_MaYa_soft_selection)
         print("操作符注销成功")
@@ -2,10 +2,17 @@
 
 import bpy
 import gpu
-import bmesh
-from bpy.types import Operator, Panel
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from bpy.types import Operator
 from gpu_extras.batch import batch_for_shader
-from mathutils import Vector, Matrix
+import numpy as np
+
+from .mesh_cache import get_snapshot, mesh_version
+from .shaders import get_shader
+from .geometry.display import compute_draw_arrays, face_draw_arrays, valence_colors
 
 bl_info = {
     "name": "顶点面显示 (Vertex Face Display)",
@@ -29,8 +36,15 @@ class VertexFaceDisplayData:
     def reset(self):
         self.draw_handler = None
         self.active_objects = None  # 修改为存储多个对象
-        self.draw_data = None
-        self.vertex_data = None
+        self.batches = None  # 网格名 -> (网格版本, 各细节层级的批次列表, 顶点数)，按最近绘制排序
+        self.resident_verts = 0  # 已上传批次的顶点总数
+        self.bounds = {}  # 物体名 -> (网格版本, (8, 3) 包围盒角点)，每帧读取 bound_box 太慢
+        self.depsgraph_handler = None  # 实时模式的更新处理函数
+        self.dirty = set()  # 等待重建的物体名
+        self.dirty_time = 0.0  # 最近一次收到网格更新的时间
+        self.queue = OrderedDict()  # 等待读取数组的网格名 -> 物体名
+        self.jobs = {}  # 网格名 -> (网格版本, 线程池中的 Future)
+        self.failed = {}  # 网格名 -> 构建失败时的网格版本，版本变化前不再重试
 
     @classmethod
     def get(cls):
@@ -38,129 +52,284 @@ class VertexFaceDisplayData:
             cls._instance = VertexFaceDisplayData()
         return cls._instance
 
-# 着色器配置
-vert_shader = '''
-uniform mat4 ModelViewProjectionMatrix;
-in vec3 position;
-in vec4 color;
-out vec4 vColor;
-void main(){
-    gl_Position = ModelViewProjectionMatrix * vec4(position, 1.0);
-    vColor = color;
-}
-'''
-frag_shader = '''
-in vec4 vColor;
-out vec4 FragColor;
-void main(){
-    FragColor = vColor;
-}
-'''
-shader = gpu.types.GPUShader(vert_shader, frag_shader)
-
 # 工具函数
+def live_objects(data):
+    """显示中仍然存在的物体；已删除的物体访问属性会抛出 ReferenceError，从列表中去掉"""
+    if not data.active_objects:
+        return []
+    alive = []
+    for obj in data.active_objects:
+        try:
+            obj.name
+        except ReferenceError:
+            continue
+        alive.append(obj)
+    if len(alive) != len(data.active_objects):
+        data.active_objects = alive
+    return alive
+
 def get_vertex_draw_data(context, obj):
     if not obj or obj.type != 'MESH':
         return None
 
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    bm.verts.ensure_lookup_table()
-
-    coords, colors = [], []
-    for v in bm.verts:
-        edges = v.link_edges
-        edge_count = len(edges)
-
-        if edge_count == 3:
-            colors.append((0.68, 0.85, 0.9, 1.0))  # 明亮浅蓝色
-        elif edge_count == 4:
-            colors.append((0.0, 1.0, 0.0, 1.0))  # 绿色
-        elif edge_count >= 5:
-            # 橙色到红色的渐变色
-            ratio = min((edge_count - 5) / 5.0, 1.0)
-            colors.append((1.0, 1.0 - ratio, 0.0, 1.0))
-        else:
-            colors.append((1.0, 1.0, 1.0, 1.0))  # 白色（默认）
-
-        coords.append(obj.matrix_world @ v.co)
-
-    bm.free()
-    return coords, colors
+    snap = get_snapshot(obj)
+    return snap.co, valence_colors(snap.valence)
 
 def get_face_draw_data(context, obj):
     if not obj or obj.type != 'MESH':
         return None
 
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    bm.faces.ensure_lookup_table()
-
-    wireframe_coords, wireframe_colors = [], []
-    fill_coords, fill_colors = [], []
-
-    scale_factor = 0.9  # 缩放倍数
-
-    for f in bm.faces:
-        face_verts = [obj.matrix_world @ v.co for v in f.verts]
-        face_center = sum(face_verts, Vector()) / len(face_verts)
-
-        # 以面中心为中心进行缩放
-        scaled_verts = []
-        for v in face_verts:
-            direction = (v - face_center).normalized()
-            scaled_verts.append(face_center + direction * (v - face_center).length * scale_factor)
-
-        # 添加单独的线框
-        for i in range(len(scaled_verts)):
-            v1 = scaled_verts[i]
-            v2 = scaled_verts[(i + 1) % len(scaled_verts)]
-            wireframe_coords.extend([v1, v2])
-            wireframe_colors.extend([(0.8, 0.8, 0.7, 1.0)] * 2)  # 浅黄灰色线框
-
-        # 添加填充区域
-        if len(scaled_verts) == 3:
-            fill_coords.extend(scaled_verts)
-            fill_colors.extend([(0.5, 0.5, 0.5, 0.5)] * 3)  # 半透明灰色填充
-        elif len(scaled_verts) == 4:
-            fill_coords.extend([scaled_verts[0], scaled_verts[1], scaled_verts[2],
-                                scaled_verts[0], scaled_verts[2], scaled_verts[3]])
-            fill_colors.extend([(0.5, 0.5, 0.5, 0.5)] * 6)
-        else:
-            for i in range(1, len(scaled_verts) - 1):
-                fill_coords.extend([scaled_verts[0], scaled_verts[i], scaled_verts[i + 1]])
-                fill_colors.extend([(0.5, 0.5, 0.5, 0.5)] * 3)
+    snap = get_snapshot(obj)
+    return face_draw_arrays(snap.co, snap.loop_verts, snap.loop_start, snap.loop_total, snap.loop_tris)
+
+# 细节层级：屏幕上顶点越密，画得越少
+LOD_FULL = 0  # 填充 + 线框 + 全部顶点
+LOD_NO_WIRE = 1  # 填充 + 非规则顶点
+LOD_IRREGULAR = 2  # 只画非规则顶点（相连边数不为 4），美术检查拓扑时最关心的部分
+LOD_SPACING = (6.0, 2.0)  # 顶点平均屏幕间距（像素）不小于这些值时分别使用前两级
+
+def build_point_batches(coords, colors, subset):
+    """全部顶点和 subset 子集共用同一个顶点缓冲，返回 (全部, 子集) 两个 POINTS 批次"""
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="position", comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="color", comp_type='F32', len=4, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(fmt, len(coords))
+    vbo.attr_fill(id="position", data=coords)
+    vbo.attr_fill(id="color", data=colors)
+    full = gpu.types.GPUBatch(type='POINTS', buf=vbo)
+    if not len(subset):
+        return full, None
+    ibo = gpu.types.GPUIndexBuf(type='POINTS', seq=subset)
+    return full, gpu.types.GPUBatch(type='POINTS', buf=vbo, elem=ibo)
+
+def extract_arrays(obj):
+    """主线程：从网格快照取出构建所需的数组。快照数组只读，可以直接交给工作线程"""
+    snap = get_snapshot(obj)
+    return snap.co, snap.valence, snap.loop_verts, snap.loop_start, snap.loop_total, snap.loop_tris
+
+def upload_batches(face_data, vertex_data, subset):
+    """主线程：上传各细节层级的批次，按绘制顺序返回 (层级列表, 顶点总数)"""
+    fill = wire = points = irregular = None
+    shader = get_shader('OBJECT_COLOR')
+    if face_data:
+        wireframe_coords, wireframe_colors, fill_coords, fill_colors = face_data
+        if len(fill_coords):
+            fill = batch_for_shader(shader, 'TRIS', {"position": fill_coords, "color": fill_colors})
+        if len(wireframe_coords):
+            wire = batch_for_shader(shader, 'LINES', {"position": wireframe_coords, "color": wireframe_colors})
+
+    if vertex_data:
+        vertex_coords, vertex_colors = vertex_data
+        points, irregular = build_point_batches(vertex_coords, vertex_colors, subset)
+
+    levels = [
+        [b for b in (fill, wire, points) if b is not None],
+        [b for b in (fill, irregular) if b is not None],
+        [b for b in (irregular,) if b is not None],
+    ]
+    n_verts = (len(face_data[0]) + len(face_data[2]) if face_data else 0) + (len(vertex_data[0]) if vertex_data else 0)
+    return levels, n_verts
+
+def select_lod(size_px, n_verts):
+    """按物体投影到屏幕的大小与顶点数估计顶点平均间距，选择细节层级"""
+    spacing = size_px / max(n_verts, 1) ** 0.5
+    if spacing >= LOD_SPACING[0]:
+        return LOD_FULL
+    if spacing >= LOD_SPACING[1]:
+        return LOD_NO_WIRE
+    return LOD_IRREGULAR
+
+EXTRACT_BUDGET = 0.02  # 每次轮询在主线程上读取网格数组的时间上限（秒）
+POLL_INTERVAL = 0.02
+
+_executor = None
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                       thread_name_prefix="vertex_face_display")
+    return _executor
+
+def request_batches(obj):
+    """把 obj 网格的批次构建排进队列，由 poll_builds 分批完成"""
+    data = VertexFaceDisplayData.get()
+    name = obj.data.name_full
+    job = data.jobs.get(name)
+    version = mesh_version(obj.data)
+    if name in data.queue or (job is not None and job[0] == version) or data.failed.get(name) == version:
+        return
+    data.queue[name] = obj.name
+    if not bpy.app.timers.is_registered(poll_builds):
+        bpy.app.timers.register(poll_builds, first_interval=0.0)
 
-    bm.free()
-    return wireframe_coords, wireframe_colors, fill_coords, fill_colors
+def poll_builds():
+    """计时器：主线程读取数组并提交线程池，再把算好的结果上传为批次，物体逐个出现"""
+    data = VertexFaceDisplayData.get()
+    if data.batches is None:
+        return None
+
+    start = time.perf_counter()
+    while data.queue and time.perf_counter() - start < EXTRACT_BUDGET:
+        name, obj_name = data.queue.popitem(last=False)
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None or obj.type != 'MESH':
+            continue
+        # 旧版本的任务直接被覆盖，结果不再使用
+        future = get_executor().submit(compute_draw_arrays, *extract_arrays(obj))
+        data.jobs[name] = (mesh_version(obj.data), future)
+
+    uploaded = False
+    for name, (version, future) in list(data.jobs.items()):
+        if not future.done():
+            continue
+        del data.jobs[name]
+        error = future.exception()
+        if error is not None:
+            data.failed[name] = version
+            print(f"顶点/面显示：构建 {name} 失败: {error!r}")
+            continue
+        data.failed.pop(name, None)
+        levels, n_verts = upload_batches(*future.result())
+        old = data.batches.pop(name, None)
+        if old is not None:
+            data.resident_verts -= old[2]
+        data.batches[name] = (version, levels, n_verts)
+        data.resident_verts += n_verts
+        uploaded = True
+
+    if uploaded:
+        tag_redraw_view3d()
+    return POLL_INTERVAL if data.queue or data.jobs else None
+
+def resident_batches(obj):
+    """绘制用的批次：还没有构建的先排队并返回 None；已有的批次直接沿用，由实时更新负责刷新"""
+    data = VertexFaceDisplayData.get()
+    name = obj.data.name_full
+    entry = data.batches.get(name)
+    if entry is None:
+        request_batches(obj)
+        return None
+    data.batches.move_to_end(name)
+    return entry[1]
+
+def evict_batches(keep, budget):
+    """常驻顶点超过上限时，从最久未绘制的开始释放不在 keep 中的网格批次"""
+    data = VertexFaceDisplayData.get()
+    for name in list(data.batches):
+        if data.resident_verts <= budget:
+            break
+        if name not in keep:
+            data.resident_verts -= data.batches.pop(name)[2]
+
+def object_bounds(obj):
+    data = VertexFaceDisplayData.get()
+    version = mesh_version(obj.data)
+    entry = data.bounds.get(obj.name)
+    if entry is None or entry[0] != version:
+        entry = data.bounds[obj.name] = (version, np.array([v[:] for v in obj.bound_box], dtype=np.float64))
+    return entry[1]
+
+def frustum_test(view_proj, objs):
+    """包围盒对视锥的测试，返回 (可见掩码, 投影大小)
+
+    8 个角点都在同一裁剪平面之外的物体被剔除；投影大小是包围盒在 NDC 中的最大跨度，
+    有角点在相机后方时视为无穷大（离得很近）。
+    """
+    mats = np.array([obj.matrix_world for obj in objs], dtype=np.float64)
+    corners = np.stack([object_bounds(obj) for obj in objs])
+    mvp = np.array(view_proj, dtype=np.float64) @ mats
+    clip = np.einsum('nij,nkj->nki', mvp[:, :, :3], corners) + mvp[:, None, :, 3]
+    xyz, w = clip[..., :3], clip[..., 3:]
+    outside = (xyz < -w).all(axis=1) | (xyz > w).all(axis=1)
+
+    in_front = (w > 0).all(axis=(1, 2))
+    ndc = xyz[..., :2] / np.where(w > 0, w, 1.0)
+    size = (ndc.max(axis=1) - ndc.min(axis=1)).max(axis=1)
+    size[~in_front] = np.inf
+    return ~outside.any(axis=1), size
 
 def draw_callback_px(context): # 修改函数参数
     data = VertexFaceDisplayData.get()
-    if not data.draw_data and not data.vertex_data:  # 修改条件
+    objs = [obj for obj in live_objects(data) if obj.type == 'MESH']
+    if not objs:
         return
+    visible, size = frustum_test(context.region_data.perspective_matrix, objs)
+    use_lod = context.scene.vertex_face_display_lod
+    # NDC 跨度为 2 对应整个区域
+    px_per_ndc = 0.5 * max(context.region.width, context.region.height)
 
+    shader = get_shader('OBJECT_COLOR')
     shader.bind()
     shader.uniform_float("ModelViewProjectionMatrix", context.region_data.perspective_matrix)
 
     # 启用深度测试
     gpu.state.depth_test_set('LESS_EQUAL')
 
-    for obj in data.active_objects: # 遍历所有活动对象
-        if obj.name in data.draw_data: # 判断是否在字典中
-            wireframe_coords, wireframe_colors, fill_coords, fill_colors = data.draw_data[obj.name]
+    drawn = set()
+    for obj, is_visible, obj_size in zip(objs, visible, size): # 只绘制视锥内的对象
+        if not is_visible:
+            continue
+        drawn.add(obj.data.name_full)
+        levels = resident_batches(obj)
+        if levels is None:
+            continue
+        level = select_lod(obj_size * px_per_ndc, len(obj.data.vertices)) if use_lod else LOD_FULL
+        # 缓冲在物体空间，移动物体只需更新矩阵
+        shader.uniform_float("ObjectMatrix", obj.matrix_world)
+        for batch in levels[level]:
+            batch.draw(shader)
 
-            if fill_coords:
-                batch = batch_for_shader(shader, 'TRIS', {"position": fill_coords, "color": fill_colors})
-                batch.draw(shader)
+    evict_batches(drawn, context.scene.vertex_face_display_max_verts)
 
-            if wireframe_coords:
-                batch = batch_for_shader(shader, 'LINES', {"position": wireframe_coords, "color": wireframe_colors})
-                batch.draw(shader)
+# ----------------------- 实时更新 -----------------------
 
-        if obj.name in data.vertex_data: # 判断是否在字典中
-            vertex_coords, vertex_colors = data.vertex_data[obj.name]
-            batch = batch_for_shader(shader, 'POINTS', {"position": vertex_coords, "color": vertex_colors})
-            batch.draw(shader)
+def tag_redraw_view3d():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def on_depsgraph_update(scene, depsgraph):
+    """只记录哪些显示中的物体网格变了，重建留给防抖的计时器"""
+    data = VertexFaceDisplayData.get()
+    if not data.batches:  # 还没有构建过的物体在第一次可见时自然取到最新数据
+        return
+    meshes = set()
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Mesh):
+            meshes.add(id_data.name_full)
+        elif isinstance(id_data, bpy.types.Object) and id_data.type == 'MESH' and update.is_updated_geometry:
+            meshes.add(id_data.data.name_full)
+    if not meshes:
+        return
+
+    data.dirty.update(obj.name for obj in live_objects(data)
+                      if obj.type == 'MESH' and obj.data.name_full in meshes and obj.data.name_full in data.batches)
+    data.dirty_time = time.time()
+    if data.dirty and not bpy.app.timers.is_registered(rebuild_dirty):
+        bpy.app.timers.register(rebuild_dirty, first_interval=REBUILD_DELAY)
+
+REBUILD_DELAY = 0.2  # 实时模式：网格停止变化这么久之后才重建
+
+def rebuild_dirty():
+    data = VertexFaceDisplayData.get()
+    if not data.batches:
+        data.dirty.clear()
+        return None
+    # 连续编辑期间一直推迟，直到网格安静下来
+    remaining = REBUILD_DELAY - (time.time() - data.dirty_time)
+    if remaining > 0:
+        return remaining
+
+    for name in data.dirty:
+        obj = bpy.data.objects.get(name)
+        # 期间被淘汰的批次不必重建，再次可见时会重新构建
+        if obj and obj.type == 'MESH' and obj.data.name_full in data.batches:
+            request_batches(obj)
+    data.dirty.clear()
+    return None
 
 # 操作符
 class OBJECT_OT_vertex_face_display(Operator):
@@ -173,8 +342,9 @@ class OBJECT_OT_vertex_face_display(Operator):
         selected_objects = context.selected_objects  # 获取选定的对象
 
         if context.mode == 'EDIT_MESH':
-            # 在编辑模式下，获取场景中所有的网格对象
-            all_mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+            # 在编辑模式下，获取当前视图层中所有可见的网格对象
+            all_mesh_objects = [obj for obj in context.view_layer.objects
+                                if obj.type == 'MESH' and obj.visible_get()]
             if not all_mesh_objects:
                 self.report({'WARNING'}, "场景中没有网格对象")
                 return {'CANCELLED'}
@@ -187,31 +357,31 @@ class OBJECT_OT_vertex_face_display(Operator):
         data.reset()
         data.active_objects = selected_objects  # 存储选定的对象
 
-        # 隐藏原始对象
-        self.original_hide_viewports = {}
+        # 隐藏原始对象：用 hide_set 而不是 hide_viewport，后者会把物体移出 depsgraph，
+        # 实时模式和网格版本就收不到这些物体的编辑
+        self.original_hide = {}
         for obj in selected_objects:
-            self.original_hide_viewports[obj] = obj.hide_viewport
-            obj.hide_viewport = True
+            self.original_hide[obj] = obj.hide_get()
+            obj.hide_set(True)
 
-        data.draw_data = {} # 修改为字典存储
-        data.vertex_data = {} # 修改为字典存储
-
-        for obj in selected_objects: # 遍历所有对象
-            if obj.type == 'MESH':
-                draw_data = get_face_draw_data(context, obj)
-                vertex_data = get_vertex_draw_data(context, obj)
-                if draw_data:
-                    data.draw_data[obj.name] = draw_data
-                if vertex_data:
-                    data.vertex_data[obj.name] = vertex_data
+        # 批次在对象第一次进入视锥时才构建，之后随网格版本刷新
+        data.batches = OrderedDict()
 
         if data.draw_handler:
             bpy.types.SpaceView3D.draw_handler_remove(data.draw_handler, 'WINDOW')
 
-        if data.draw_data or data.vertex_data:  # 修改条件
+        if any(obj.type == 'MESH' for obj in selected_objects):
             args = (context,)  # 修改参数
             data.draw_handler = bpy.types.SpaceView3D.draw_handler_add(draw_callback_px, args, 'WINDOW', 'POST_VIEW')
 
+            # 上一次运行可能留下了处理函数，先移除再按当前设置添加，保证 cancel 能找到它
+            handlers = bpy.app.handlers.depsgraph_update_post
+            if on_depsgraph_update in handlers:
+                handlers.remove(on_depsgraph_update)
+            if context.scene.vertex_face_display_live:
+                handlers.append(on_depsgraph_update)
+                data.depsgraph_handler = on_depsgraph_update
+
             context.window_manager.modal_handler_add(self)
             context.scene.vertex_face_display_enabled = True # 启用场景属性
             return {'RUNNING_MODAL'}
@@ -222,12 +392,20 @@ class OBJECT_OT_vertex_face_display(Operator):
         data = VertexFaceDisplayData.get()
         if data.draw_handler:
             bpy.types.SpaceView3D.draw_handler_remove(data.draw_handler, 'WINDOW')
+        if data.depsgraph_handler in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(data.depsgraph_handler)
+        for timer in (rebuild_dirty, poll_builds):
+            if bpy.app.timers.is_registered(timer):
+                bpy.app.timers.unregister(timer)
         data.reset()
 
         # 显示原始对象
-        if hasattr(self, 'original_hide_viewports'):
-            for obj, hide_viewport in self.original_hide_viewports.items():
-                obj.hide_viewport = hide_viewport
+        if hasattr(self, 'original_hide'):
+            for obj, hidden in self.original_hide.items():
+                try:
+                    obj.hide_set(hidden)
+                except ReferenceError:  # 显示期间被删除的物体
+                    pass
         # 选中显示的对象
         if data.active_objects:
             bpy.ops.object.select_all(action='DESELECT')
@@ -249,26 +427,16 @@ class OBJECT_OT_vertex_face_display(Operator):
 
 
 
-# 快捷键映射
-addon_keymaps = []
-
 def register():
+    # 场景属性和 Shift+B 快捷键在模块加载前就需要，由包的 __init__ 和 keycore 注册
     bpy.utils.register_class(OBJECT_OT_vertex_face_display)
 
-    bpy.types.Scene.vertex_face_display_enabled = bpy.props.BoolProperty(name="顶点/面显示启用", default=False) # 添加场景属性
-
-    wm = bpy.context.window_manager
-    kc = wm.keyconfigs.addon
-    if kc:
-        km = kc.keymaps.new(name='3D View', space_type='VIEW_3D')
-        kmi = km.keymap_items.new(OBJECT_OT_vertex_face_display.bl_idname, 'B', 'PRESS', shift=True)
-        addon_keymaps.append((km, kmi))
-
 def unregister():
     bpy.utils.unregister_class(OBJECT_OT_vertex_face_display)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
 
-    del bpy.types.Scene.vertex_face_display_enabled # 移除场景属性
-
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
\ No newline at end of file
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
\ No newline at end of file
@@ -0,0 +1,376 @@
+import bpy
+import bmesh
+from collections import OrderedDict
+from itertools import chain
+
+try:
+    import numpy as np
+    from .geometry.topology import vertex_valence
+except ImportError:  # 没有 numpy 时只提供版本计数
+    np = None
+
+
+# ----------------------- 读取网格数组 -----------------------
+
+def bmesh_vert_coords(bm):
+    """把 bmesh 顶点坐标一次性读成 (n, 3) float32 数组"""
+    n = len(bm.verts)
+    co = np.fromiter(chain.from_iterable(v.co for v in bm.verts), dtype=np.float32, count=n * 3)
+    return co.reshape(n, 3)
+
+
+def bmesh_vert_select(bm):
+    return np.fromiter((v.select for v in bm.verts), dtype=bool, count=len(bm.verts))
+
+
+def bmesh_edge_verts(bm):
+    """(m, 2) 的边顶点索引数组"""
+    bm.verts.index_update()
+    m = len(bm.edges)
+    ev = np.fromiter(chain.from_iterable((e.verts[0].index, e.verts[1].index) for e in bm.edges),
+                     dtype=np.int32, count=m * 2)
+    return ev.reshape(m, 2)
+
+
+def bmesh_face_loops(bm):
+    """面的环数组：(loop_verts, loop_start, loop_total)，与 Mesh.polygons 的布局一致"""
+    bm.verts.index_update()
+    loop_total = np.fromiter((len(f.verts) for f in bm.faces), dtype=np.int32, count=len(bm.faces))
+    loop_start = np.zeros(len(loop_total), dtype=np.int32)
+    np.cumsum(loop_total[:-1], out=loop_start[1:])
+    loop_verts = np.fromiter(chain.from_iterable((v.index for v in f.verts) for f in bm.faces),
+                             dtype=np.int32, count=int(loop_total.sum()))
+    return loop_verts, loop_start, loop_total
+
+
+def bmesh_loop_triangles(bm, loop_verts, loop_start, loop_total):
+    """bmesh 三角化结果的 (t, 3) 环索引，指向 bmesh_face_loops 返回的 loop_verts
+
+    三角形的环以 (面, 顶点) 给出，面内顶点不重复，因此用 面 * 顶点数 + 顶点 作为键
+    在排好序的全部环中查找对应的环索引。Python 中无法保证 BMLoop.index 有效，不能直接读取。
+    """
+    bm.verts.index_update()
+    bm.faces.index_update()
+    tris = bm.calc_loop_triangles()
+    # 每个三角形的三个环属于同一个面，面只读一次
+    rows = np.fromiter(chain.from_iterable((a.face.index, a.vert.index, b.vert.index, c.vert.index)
+                                           for a, b, c in tris),
+                       dtype=np.int64, count=len(tris) * 4).reshape(-1, 4)
+    tri_face, tri_verts = rows[:, 0], rows[:, 1:]
+    n_verts = len(bm.verts)
+    keys = np.repeat(np.arange(len(loop_total), dtype=np.int64), loop_total) * n_verts + loop_verts
+    order = np.argsort(keys, kind='stable')
+    loops = order[np.searchsorted(keys[order], tri_face[:, None] * n_verts + tri_verts)]
+    # 按面排列，与 Mesh.loop_triangles 的布局一致
+    if len(tri_face) and (np.diff(tri_face) < 0).any():
+        loops = loops[np.argsort(tri_face, kind='stable')]
+    return loops.astype(np.int32)
+
+
+def foreach_array(collection, attr, dtype, width=1):
+    """foreach_get 读取一个属性
+
+    dtype 要与 RNA 属性的存储类型一致才能走整块复制，索引类属性是无符号的，
+    用 uint32 读取后再按 int32 视图返回。
+    """
+    arr = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    return arr.reshape(-1, width) if width > 1 else arr
+
+
+# ----------------------- 网格快照 -----------------------
+
+class MeshSnapshot:
+    """一个网格在某个版本下的 NumPy 数组，按需读取，读过的数组一直保留到版本变化
+
+    编辑模式从 bmesh 读取，物体模式用 foreach_get 读取 Mesh。
+    geometry_key 为 (元素数, 几何版本)，只改变选择的 depsgraph 更新不会改变它，
+    此时沿用上一个快照的坐标和拓扑数组；select_key 为网格版本，任何更新都会改变它。
+    topology_key 为 (元素数, 拓扑版本)，只移动顶点时不变，供拓扑统计等只依赖连接关系的缓存使用。
+    """
+    # 只依赖坐标和拓扑的数组
+    GEOMETRY_ARRAYS = ("co", "edges", "loop_verts", "loop_start", "loop_total", "loop_tris", "valence")
+
+    def __init__(self, mesh, version, geometry_version, topology_version, previous=None):
+        self.mesh_name = mesh.name_full
+        self.version = version
+        self.edit = mesh.is_editmode
+        self.arrays = {}
+        if self.edit:
+            bm = bmesh.from_edit_mesh(mesh)
+            counts = (len(bm.verts), len(bm.edges), len(bm.faces))
+        else:
+            counts = (len(mesh.vertices), len(mesh.edges), len(mesh.polygons))
+        self.counts = counts
+        self.geometry_key = (counts, geometry_version)
+        self.topology_key = (counts, topology_version)
+        self.select_key = version
+        # 元素数是额外的保险：没有经过 depsgraph 的脚本修改至少在增删元素时能被发现
+        if previous is not None and previous.geometry_key == self.geometry_key:
+            for name in self.GEOMETRY_ARRAYS:
+                if name in previous.arrays:
+                    self.arrays[name] = previous.arrays[name]
+
+    @property
+    def fingerprint(self):
+        return self.geometry_key, self.select_key
+
+    def _mesh(self):
+        return bpy.data.meshes[self.mesh_name]
+
+    def _bmesh(self):
+        return bmesh.from_edit_mesh(self._mesh())
+
+    def _get(self, name, read):
+        arr = self.arrays.get(name)
+        if arr is None:
+            arr = self.arrays[name] = read()
+            MeshSnapshotCache.get().trim()
+        return arr
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+    @property
+    def co(self):
+        def read():
+            if self.edit:
+                return bmesh_vert_coords(self._bmesh())
+            return foreach_array(self._mesh().vertices, "co", np.float32, 3)
+        return self._get("co", read)
+
+    @property
+    def select(self):
+        def read():
+            if self.edit:
+                return bmesh_vert_select(self._bmesh())
+            return foreach_array(self._mesh().vertices, "select", bool)
+        return self._get("select", read)
+
+    @property
+    def selected(self):
+        """选中顶点的索引"""
+        return self._get("selected", lambda: np.flatnonzero(self.select))
+
+    @property
+    def edges(self):
+        def read():
+            if self.edit:
+                return bmesh_edge_verts(self._bmesh())
+            return foreach_array(self._mesh().edges, "vertices", np.uint32, 2).view(np.int32)
+        return self._get("edges", read)
+
+    def _read_faces(self):
+        if self.edit:
+            loop_verts, loop_start, loop_total = bmesh_face_loops(self._bmesh())
+        else:
+            me = self._mesh()
+            loop_verts = foreach_array(me.loops, "vertex_index", np.uint32).view(np.int32)
+            loop_start = foreach_array(me.polygons, "loop_start", np.uint32).view(np.int32)
+            # 面的环是连续存放的，环数由相邻起点相减得到，比逐个读取 loop_total 快
+            loop_total = np.diff(loop_start, append=np.int32(len(loop_verts))).astype(np.int32)
+        self.arrays["loop_start"] = loop_start
+        self.arrays["loop_total"] = loop_total
+        return loop_verts
+
+    @property
+    def loop_verts(self):
+        return self._get("loop_verts", self._read_faces)
+
+    @property
+    def loop_start(self):
+        self.loop_verts
+        return self.arrays["loop_start"]
+
+    @property
+    def loop_total(self):
+        self.loop_verts
+        return self.arrays["loop_total"]
+
+    @property
+    def loop_tris(self):
+        """(t, 3) 的三角形环索引，指向 loop_verts"""
+        def read():
+            if self.edit:
+                return bmesh_loop_triangles(self._bmesh(), self.loop_verts, self.loop_start, self.loop_total)
+            me = self._mesh()
+            me.calc_loop_triangles()
+            return foreach_array(me.loop_triangles, "loops", np.uint32, 3).view(np.int32)
+        return self._get("loop_tris", read)
+
+    @property
+    def valence(self):
+        """每个顶点相连的边数"""
+        return self._get("valence", lambda: vertex_valence(self.edges, self.counts[0]))
+
+
+class MeshSnapshotCache:
+    """所有操作符共享的网格快照缓存
+
+    以网格数据块为键（共用网格的物体共用快照），depsgraph 更新时该网格的版本加一，
+    版本不变时直接复用已读取的数组。总大小超过 budget 时按最久未使用淘汰。
+    """
+    _instance = None
+    BUDGET = 256 * 1024 * 1024
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.versions = {}  # 网格名 -> 任何更新都会增加的版本
+        self.geometry_versions = {}  # 网格名 -> 只在几何（坐标或拓扑）更新时增加的版本
+        self.topology_versions = {}  # 网格名 -> 拓扑可能变化时增加的版本，见 topology_may_change
+        self.last_operator = None  # 上一次 depsgraph 更新时最近完成的操作符
+        self.budget = self.BUDGET
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = MeshSnapshotCache()
+        if not _registered:
+            # 本模块在第一次取快照时才导入，此时才开始跟踪网格版本
+            register()
+        return cls._instance
+
+    def version(self, mesh):
+        return self.versions.get(mesh.name_full, 0)
+
+    def geometry_version(self, mesh):
+        return self.geometry_versions.get(mesh.name_full, 0)
+
+    def topology_version(self, mesh):
+        return self.topology_versions.get(mesh.name_full, 0)
+
+    def snapshot(self, obj):
+        return self.snapshot_mesh(obj.data)
+
+    def snapshot_mesh(self, mesh):
+        key = (mesh.name_full, mesh.is_editmode)
+        version = self.version(mesh)
+        snap = self.entries.get(key)
+        if snap is None or snap.version != version:
+            snap = self.entries[key] = MeshSnapshot(mesh, version, self.geometry_version(mesh),
+                                                     self.topology_version(mesh), snap)
+        self.entries.move_to_end(key)
+        return snap
+
+    def invalidate(self, mesh_name, geometry=True, topology=True):
+        """网格有更新；geometry 为 False 表示只有选择等非几何数据变化，topology 为 False 表示只移动了顶点"""
+        self.versions[mesh_name] = self.versions.get(mesh_name, 0) + 1
+        if geometry:
+            self.geometry_versions[mesh_name] = self.geometry_versions.get(mesh_name, 0) + 1
+            if topology:
+                self.topology_versions[mesh_name] = self.topology_versions.get(mesh_name, 0) + 1
+
+    def trim(self):
+        total = sum(snap.nbytes for snap in self.entries.values())
+        while total > self.budget and len(self.entries) > 1:
+            _, snap = self.entries.popitem(last=False)
+            total -= snap.nbytes
+
+    def clear(self):
+        self.entries.clear()
+        self.versions.clear()
+        self.geometry_versions.clear()
+        self.topology_versions.clear()
+
+
+def get_snapshot(obj):
+    """obj 网格当前版本的快照"""
+    return MeshSnapshotCache.get().snapshot(obj)
+
+
+def get_mesh_snapshot(mesh):
+    """不经过物体，直接取网格数据块的快照"""
+    return MeshSnapshotCache.get().snapshot_mesh(mesh)
+
+
+def mesh_version(mesh):
+    return MeshSnapshotCache.get().version(mesh)
+
+
+def mesh_fingerprint(mesh):
+    """网格内容的键：有 numpy 时为快照指纹，内容不变的 depsgraph 更新不会改变它；否则为网格版本"""
+    if np is None:
+        return mesh_version(mesh)
+    return get_mesh_snapshot(mesh).fingerprint
+
+
+# ----------------------- 更新处理 -----------------------
+
+# 只移动顶点的操作符
+COORDINATE_OPERATORS = ("TRANSFORM_OT_",)
+
+
+def last_operator():
+    """最近完成的已注册操作符：(指针, bl_idname)，没有记录时为 None"""
+    operators = bpy.context.window_manager.operators
+    if not len(operators):
+        return None
+    op = operators[-1]
+    return op.as_pointer(), op.bl_idname
+
+
+def topology_may_change(cache):
+    """本次 depsgraph 更新中的几何变化是否可能改变了拓扑
+
+    depsgraph 不区分坐标和拓扑的更新，借助最近完成的操作符判断：模态变换进行中没有新的操作符完成，
+    变换完成时新增的是 TRANSFORM_OT_*，这两种情况只移动了顶点。新完成的其他操作符、
+    没有操作符记录（后台运行）时保守地视为拓扑可能变化。
+    不经过操作符、元素数不变的脚本拓扑修改不会被发现，增删元素时拓扑键中的元素数仍会变化。
+    """
+    op = last_operator()
+    new_op = op != cache.last_operator
+    cache.last_operator = op
+    return op is None or (new_op and not op[1].startswith(COORDINATE_OPERATORS))
+
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update(scene, depsgraph):
+    cache = MeshSnapshotCache.get()
+    # 每次更新都记录操作符，选择等操作完成后的第一次变换不会被误判为拓扑变化
+    topology = topology_may_change(cache)
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Mesh):
+            # 编辑模式下的选择操作报告 is_updated_geometry=False，变换和拓扑编辑为 True
+            cache.invalidate(id_data.name_full, geometry=update.is_updated_geometry, topology=topology)
+        elif isinstance(id_data, bpy.types.Object) and id_data.type == 'MESH' and update.is_updated_geometry:
+            cache.invalidate(id_data.data.name_full, topology=topology)
+
+
+@bpy.app.handlers.persistent
+def on_reload(*args):
+    # 撤销、重做和打开文件后网格数据块可能被整体替换
+    cache = MeshSnapshotCache.get()
+    for name in list(cache.versions) + [key[0] for key in cache.entries]:
+        cache.invalidate(name)
+    cache.entries.clear()
+
+
+_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+    (bpy.app.handlers.undo_post, on_reload),
+    (bpy.app.handlers.redo_post, on_reload),
+    (bpy.app.handlers.load_post, on_reload),
+)
+
+
+_registered = False
+
+
+def register():
+    global _registered
+    for handlers, func in _handlers:
+        if func not in handlers:
+            handlers.append(func)
+    _registered = True
+
+
+def unregister():
+    global _registered
+    for handlers, func in _handlers:
+        if func in handlers:
+            handlers.remove(func)
+    _registered = False
+    if MeshSnapshotCache._instance is not None:
+        MeshSnapshotCache._instance.clear()
@@ -0,0 +1,170 @@
+"""网格拓扑统计：顶点边数、极点、三角/四边/多边面统计和边界边
+
+按网格的拓扑键缓存（只移动顶点不会重算），可在界面面板中查看，也可以在后台批量审查整个 .blend：
+    blender --background file.blend --python-expr "import bpy; bpy.ops.mesh.topology_audit(filepath='report.json')"
+
+本模块随插件启动注册；网格快照和统计（numpy）在第一次统计时才导入。
+"""
+import bpy
+import json
+from bpy.types import Operator, Panel
+
+
+# ----------------------- 统计 -----------------------
+
+def snapshot_topology(snap):
+    """用网格快照的数组构建 MeshTopology"""
+    from .geometry.topology import MeshTopology
+    return MeshTopology(snap.edges, snap.loop_verts, snap.loop_start, snap.loop_total,
+                        snap.counts[0], valence=snap.valence)
+
+
+_cache = {}  # 网格名 -> (拓扑键, MeshTopology)
+
+
+def cached_topology(mesh):
+    """(当前拓扑键, 缓存的统计)，缓存过期或不存在时统计为 None，不做计算"""
+    from .mesh_cache import get_mesh_snapshot
+    key = get_mesh_snapshot(mesh).topology_key
+    entry = _cache.get(mesh.name_full)
+    return key, (entry[1] if entry is not None and entry[0] == key else None)
+
+
+def mesh_topology(mesh):
+    """mesh 当前拓扑的统计，拓扑键不变时直接返回缓存"""
+    from .mesh_cache import get_mesh_snapshot
+    snap = get_mesh_snapshot(mesh)
+    entry = _cache.get(mesh.name_full)
+    if entry is None or entry[0] != snap.topology_key:
+        entry = _cache[mesh.name_full] = (snap.topology_key, snapshot_topology(snap))
+    return entry[1]
+
+
+DRAW_LIMIT = 50000  # 顶点数超过此值的网格不在面板绘制中统计，交给计时器
+
+_pending = set()  # 等待计时器统计的网格名
+
+
+def refresh_pending():
+    """计时器：统计面板请求的网格，完成后重绘"""
+    for name in _pending:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None:
+            mesh_topology(mesh)
+    _pending.clear()
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+
+def request_refresh(mesh):
+    _pending.add(mesh.name_full)
+    if not bpy.app.timers.is_registered(refresh_pending):
+        bpy.app.timers.register(refresh_pending, first_interval=0.0)
+
+
+def audit_meshes(meshes=None):
+    """统计多个网格（默认当前文件中的全部网格），返回 {网格名: 统计字典}"""
+    if meshes is None:
+        meshes = bpy.data.meshes
+    return {mesh.name_full: mesh_topology(mesh).as_dict() for mesh in meshes}
+
+
+# ----------------------- 操作符 -----------------------
+
+class MESH_OT_topology_audit(Operator):
+    bl_idname = "mesh.topology_audit"
+    bl_label = "拓扑审查"
+    bl_description = "统计当前文件中所有网格的拓扑，可写入 JSON 报告"
+
+    filepath: bpy.props.StringProperty(name="报告路径", subtype='FILE_PATH', default="")
+
+    def execute(self, context):
+        report = audit_meshes()
+        if self.filepath:
+            with open(bpy.path.abspath(self.filepath), "w", encoding="utf-8") as f:
+                json.dump({"blend": bpy.data.filepath, "meshes": report}, f, ensure_ascii=False, indent=2)
+
+        ngons = sum(r["ngons"] for r in report.values())
+        poles = sum(r["poles"] for r in report.values())
+        self.report({'INFO'}, f"{len(report)} 个网格，多边面 {ngons}，极点 {poles}")
+        return {'FINISHED'}
+
+
+# ----------------------- 面板 -----------------------
+
+class VIEW3D_PT_mesh_topology(Panel):
+    bl_idname = "VIEW3D_PT_mesh_topology"
+    bl_label = "拓扑统计"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Maya Tool"
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH'
+
+    def draw(self, context):
+        layout = self.layout
+        self.draw_stats(layout, context.active_object.data)
+        self.draw_display_settings(layout, context.scene)
+
+    def draw_display_settings(self, layout, scene):
+        """顶点/面显示的设置；场景属性由包的 __init__ 注册"""
+        box = layout.box()
+        box.label(text="顶点/面显示")
+        col = box.column(align=True)
+        col.prop(scene, "vertex_face_display_live")
+        col.prop(scene, "vertex_face_display_lod")
+        col.prop(scene, "vertex_face_display_max_verts")
+
+    def draw_stats(self, layout, mesh):
+        key, stats = cached_topology(mesh)
+        if stats is None:
+            if key[0][0] <= DRAW_LIMIT:
+                stats = mesh_topology(mesh)
+            else:
+                # 大网格不在绘制中统计；有旧的统计时先显示旧的
+                request_refresh(mesh)
+                entry = _cache.get(mesh.name_full)
+                if entry is None:
+                    layout.label(text="正在统计…", icon='TIME')
+                    return
+                layout.label(text="拓扑已变化，正在重新统计…", icon='TIME')
+                stats = entry[1]
+
+        col = layout.column(align=True)
+        col.label(text=f"顶点 {stats.verts}  边 {stats.edges}  面 {stats.faces}")
+        col.label(text=f"三角面 {stats.tris}  四边面 {stats.quads}  多边面 {stats.ngons}")
+        col.label(text=f"极点 {len(stats.poles)}（三星 {stats.n_poles}，五星及以上 {stats.e_poles}）")
+        col.label(text=f"边界边 {stats.boundary_edges}  非流形边 {stats.non_manifold_edges}")
+
+        box = layout.box()
+        box.label(text="顶点边数分布")
+        for valence, count in stats.valence_histogram.items():
+            box.label(text=f"{valence} 边：{count}")
+
+        layout.operator(MESH_OT_topology_audit.bl_idname, text="审查文件中所有网格")
+
+
+classes = [
+    MESH_OT_topology_audit,
+    VIEW3D_PT_mesh_topology,
+]
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    if bpy.app.timers.is_registered(refresh_pending):
+        bpy.app.timers.unregister(refresh_pending)
+    _pending.clear()
+    _cache.clear()
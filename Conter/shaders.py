@@ -0,0 +1,150 @@
+"""着色器注册表：第一次使用时才编译，按 GPU 上下文缓存
+
+导入模块不再创建 GPUShader，插件加载更快，blender --background 下也能导入。
+注册后用计时器在空闲时逐个预编译，第一次绘制时不用再等编译。
+"""
+import bpy
+import gpu
+
+
+# ----------------------- 着色器源码 -----------------------
+
+# 逐顶点颜色，物体矩阵在着色器里应用，缓冲保持物体空间
+OBJECT_COLOR_VERT = '''
+uniform mat4 ModelViewProjectionMatrix;
+uniform mat4 ObjectMatrix;
+in vec3 position;
+in vec4 color;
+out vec4 vColor;
+void main(){
+    gl_Position = ModelViewProjectionMatrix * ObjectMatrix * vec4(position, 1.0);
+    vColor = color;
+}
+'''
+
+COLOR_FRAG = '''
+in vec4 vColor;
+out vec4 FragColor;
+void main(){
+    FragColor = vColor;
+}
+'''
+
+# 在顶点阶段按 center/radius 计算与 calculate_falloff 相同的四段渐变，
+# key 为所属元素到中心的最小距离，超出半径的元素被移出裁剪空间
+FALLOFF_VERT = '''
+uniform mat4 ModelViewProjectionMatrix;
+uniform mat4 ObjectMatrix;
+uniform vec3 center;
+uniform float radius;
+in vec3 position;
+in float key;
+out vec4 vColor;
+void main(){
+    if (key > radius) {
+        gl_Position = vec4(0.0, 0.0, 2.0, 1.0);
+        vColor = vec4(0.0);
+        return;
+    }
+    gl_Position = ModelViewProjectionMatrix * ObjectMatrix * vec4(position, 1.0);
+    float r = max(radius, 1e-6);
+    float t = min(distance(position, center), r) / r;
+    float alpha = 0.8 + 0.2 * (1.0 - t);
+    if (t < 0.25) {
+        vColor = vec4(1.0, t * 4.0, 0.0, alpha);
+    } else if (t < 0.5) {
+        vColor = vec4(1.0 - (t - 0.25) * 4.0, 1.0, 0.0, alpha);
+    } else if (t < 0.75) {
+        vColor = vec4(0.0, 1.0 - (t - 0.5) * 4.0, 0.0, alpha);
+    } else {
+        float gray = 1.0 - (t - 0.75) * 4.0;
+        vColor = vec4(gray * 0.2, gray * 0.3, gray * 0.2, alpha);
+    }
+}
+'''
+
+SOURCES = {
+    "OBJECT_COLOR": (OBJECT_COLOR_VERT, COLOR_FRAG),
+    "FALLOFF": (FALLOFF_VERT, COLOR_FRAG),
+}
+
+
+# ----------------------- 注册表 -----------------------
+
+def context_key():
+    """当前 GPU 上下文的键
+
+    Blender 的所有窗口共用一组 GPU 资源，Python 只能区分后端（OpenGL/Metal/Vulkan），
+    切换后端需要重启，因此以后端类型为键即可区分不同的上下文。
+    """
+    platform = getattr(gpu, "platform", None)
+    if platform is not None and hasattr(platform, "backend_type_get"):
+        return platform.backend_type_get()
+    return 'OPENGL'
+
+
+class ShaderRegistry:
+    """按 (上下文, 名称) 缓存编译好的着色器"""
+    _instance = None
+
+    def __init__(self):
+        self.compiled = {}
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = ShaderRegistry()
+        return cls._instance
+
+    def shader(self, name):
+        key = (context_key(), name)
+        shader = self.compiled.get(key)
+        if shader is None:
+            vert, frag = SOURCES[name]
+            shader = self.compiled[key] = gpu.types.GPUShader(vert, frag)
+        return shader
+
+    def pending(self):
+        ctx = context_key()
+        return [name for name in SOURCES if (ctx, name) not in self.compiled]
+
+    def clear(self):
+        self.compiled.clear()
+
+
+def get_shader(name):
+    """名称对应的着色器，当前上下文中第一次使用时编译"""
+    return ShaderRegistry.get().shader(name)
+
+
+# ----------------------- 预编译 -----------------------
+
+PREWARM_DELAY = 0.5  # 注册后等界面起来再开始编译
+
+
+def prewarm():
+    """计时器：每次只编译一个着色器，避免长时间卡住界面"""
+    registry = ShaderRegistry.get()
+    pending = registry.pending()
+    if not pending:
+        return None
+    try:
+        registry.shader(pending[0])
+    except Exception as e:
+        # 没有可用的 GPU 上下文时留到第一次绘制再编译
+        print(f"着色器预编译失败: {e}")
+        return None
+    return 0.0 if len(pending) > 1 else None
+
+
+def register():
+    if bpy.app.background:
+        return
+    if not bpy.app.timers.is_registered(prewarm):
+        bpy.app.timers.register(prewarm, first_interval=PREWARM_DELAY)
+
+
+def unregister():
+    if bpy.app.timers.is_registered(prewarm):
+        bpy.app.timers.unregister(prewarm)
+    ShaderRegistry.get().clear()
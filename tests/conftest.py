@@ -0,0 +1,85 @@
+"""geometry 包的测试：普通 Python + NumPy 即可运行，不需要 Blender
+
+    python -m pytest tests
+    python -m pytest tests --benchmark-only    # 只跑基准（需要 pytest-benchmark）
+
+geometry 按 benchmark.py 作为脚本运行时的方式导入（把 Conter 目录加入 sys.path），
+不会经过需要 bpy 的包 __init__。
+"""
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Conter"))
+
+from benchmark import make_mesh, quad_faces, grid_mesh, scan_mesh, sphere_mesh  # noqa: E402
+
+
+# ----------------------- 参考实现 -----------------------
+
+def load_reference():
+    """逐元素参考实现依赖 mathutils：可以是单独安装的，也可以是 pip 安装的 bpy 模块带的"""
+    try:
+        import mathutils  # noqa: F401
+    except ImportError:
+        pytest.importorskip("bpy")
+    return importlib.import_module("geometry.reference")
+
+
+class Element:
+    """BMVert/BMEdge/BMFace 的替身：只带属性，按身份哈希（参考实现用面作字典键）"""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+def reference_bmesh(mesh):
+    """参考实现只用到 verts/edges/faces 和元素的 co/verts，用 mathutils.Vector 搭一个等价的结构"""
+    from mathutils import Vector
+    verts = [Element(co=Vector(c)) for c in mesh["co"].tolist()]
+    edges = [Element(verts=(verts[a], verts[b])) for a, b in mesh["edges"].tolist()]
+    loop_verts = mesh["loop_verts"].tolist()
+    faces = [Element(verts=[verts[i] for i in loop_verts[s:s + t]])
+             for s, t in zip(mesh["loop_start"].tolist(), mesh["loop_total"].tolist())]
+    return Element(verts=verts, edges=edges, faces=faces)
+
+
+# ----------------------- 测试数据 -----------------------
+
+def mixed_mesh(n_side=24, seed=0):
+    """带噪声的平面，混合三角面、四边面和五边面"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(-1, 1, n_side)
+    xx, yy = np.meshgrid(x, x, indexing='ij')
+    co = np.stack((xx.ravel(), yy.ravel(), np.zeros(xx.size)), axis=1)
+    step = 2.0 / (n_side - 1)
+    co += rng.uniform(-0.2, 0.2, co.shape) * step
+
+    quads = quad_faces(n_side, n_side)
+    kind = rng.integers(0, 3, len(quads))
+    tris = np.concatenate((quads[kind == 0][:, [0, 1, 2]], quads[kind == 0][:, [0, 2, 3]]))
+    # 五边形：在四边面的一条边中点加一个顶点
+    pent_quads = quads[kind == 2]
+    mid = len(co) + np.arange(len(pent_quads))
+    co = np.concatenate((co, (co[pent_quads[:, 0]] + co[pent_quads[:, 1]]) / 2))
+    pents = np.stack((pent_quads[:, 0], mid, pent_quads[:, 1], pent_quads[:, 2], pent_quads[:, 3]), axis=1)
+    return make_mesh(co, [tris, quads[kind == 1], pents])
+
+
+def sorted_rows(*columns):
+    """把逐行对应的若干数组拼成记录并按字典序排序，用于比较顺序不同的绘制缓冲"""
+    rows = np.concatenate([np.asarray(c, dtype=np.float64).reshape(len(columns[0]), -1) for c in columns], axis=1)
+    return rows[np.lexsort(np.round(rows, 4).T[::-1])]
+
+
+@pytest.fixture(scope="module")
+def mesh():
+    return mixed_mesh()
+
+
+@pytest.fixture(scope="module", params=["grid", "sphere", "scan"])
+def large_mesh(request):
+    return {"grid": grid_mesh, "sphere": sphere_mesh, "scan": scan_mesh}[request.param](100_000)
@@ -0,0 +1,104 @@
+"""热点路径的基准，每种网格约 10 万顶点；用 --benchmark-skip 跳过，--benchmark-only 只跑这些"""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmark import pick_center  # noqa: E402
+from geometry.display import compute_draw_arrays  # noqa: E402
+from geometry.falloff import (RadiusRing, SelectionAccumulator, calculate_falloff_array,  # noqa: E402
+                              get_draw_data_geodesic, get_draw_data_nearest, get_draw_data_np)
+from geometry.polygons import fan_triangles, inset_loops  # noqa: E402
+from geometry.spatial_index import SpatialIndex  # noqa: E402
+from geometry.topology import MeshTopology, vertex_valence  # noqa: E402
+
+RADIUS = 0.2  # 相对包围盒对角线
+
+
+def build_index(mesh):
+    return SpatialIndex(mesh["co"], mesh["edges"], mesh["loop_verts"], mesh["loop_start"], mesh["loop_total"])
+
+
+@pytest.fixture(scope="module")
+def index(large_mesh):
+    return build_index(large_mesh)
+
+
+def test_bench_spatial_index_build(benchmark, large_mesh):
+    benchmark(build_index, large_mesh)
+
+
+def test_bench_falloff_colors(benchmark, large_mesh):
+    d = np.random.default_rng(0).random(len(large_mesh["co"]))
+    benchmark(calculate_falloff_array, d, 1.0)
+
+
+@pytest.mark.parametrize("mode", ['VERT', 'EDGE', 'FACE'])
+def test_bench_draw_data(benchmark, large_mesh, index, mode):
+    center, diag = pick_center(large_mesh["co"])
+    benchmark(get_draw_data_np, index, center, RADIUS * diag, mode)
+
+
+@pytest.mark.parametrize("mode", ['VERT', 'FACE'])
+def test_bench_radius_drag(benchmark, large_mesh, index, mode):
+    """拖动半径：同一个 RadiusRing 上连续增大的半径"""
+    center, diag = pick_center(large_mesh["co"])
+    radii = np.linspace(0.05, RADIUS, 20) * diag
+
+    def drag():
+        ring = RadiusRing(index, center, mode, key=None)
+        for r in radii:
+            ring.positions(r)
+    benchmark(drag)
+
+
+def test_bench_nearest(benchmark, large_mesh, index):
+    _, diag = pick_center(large_mesh["co"])
+    seeds = np.arange(0, len(large_mesh["co"]), len(large_mesh["co"]) // 8)
+    benchmark(get_draw_data_nearest, index, seeds, 0.05 * diag, 'VERT')
+
+
+def test_bench_geodesic(benchmark, large_mesh, index):
+    center, diag = pick_center(large_mesh["co"])
+    seed = np.argmin(((large_mesh["co"] - center) ** 2).sum(axis=1))
+    benchmark(get_draw_data_geodesic, index, np.array([seed]), 0.1 * diag, 'EDGE')
+
+
+def test_bench_inset_and_triangulate(benchmark, large_mesh):
+    loop_co = large_mesh["co"][large_mesh["loop_verts"]].astype(np.float64)
+
+    def run():
+        moved = inset_loops(loop_co, large_mesh["loop_start"], large_mesh["loop_total"])
+        return moved[fan_triangles(large_mesh["loop_start"], large_mesh["loop_total"]).ravel()]
+    benchmark(run)
+
+
+def test_bench_vertex_face_display(benchmark, large_mesh):
+    m = large_mesh
+    valence = vertex_valence(m["edges"], len(m["co"]))
+    loop_tris = fan_triangles(m["loop_start"], m["loop_total"])
+    benchmark(compute_draw_arrays, m["co"], valence, m["loop_verts"], m["loop_start"], m["loop_total"], loop_tris)
+
+
+def test_bench_topology_census(benchmark, large_mesh):
+    m = large_mesh
+    benchmark(MeshTopology, m["edges"], m["loop_verts"], m["loop_start"], m["loop_total"], len(m["co"]))
+
+
+def test_bench_selection_click(benchmark, large_mesh):
+    """点击选择：累加器只处理变化的顶点"""
+    co = large_mesh["co"]
+    mask = np.zeros(len(co), dtype=bool)
+    mask[::7] = True
+    selections = []
+    for i in range(10):
+        mask[i * 101:i * 101 + 20] ^= True
+        selections.append(np.flatnonzero(mask))
+    acc = SelectionAccumulator()
+    acc.rebuild(co, selections[0])
+
+    def click():
+        for key, selected in enumerate(selections):
+            acc.update(co, selected, key=key)
+        acc.center
+    benchmark(click)
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from conftest import load_reference, reference_bmesh, sorted_rows
+from geometry.falloff import (RadiusRing, SelectionAccumulator, calculate_falloff_array, get_draw_data_geodesic,
+                              get_draw_data_nearest, get_draw_data_np, selection_center, transform_points)
+from geometry.spatial_index import SpatialIndex
+
+MODES = ('VERT', 'EDGE', 'FACE')
+CENTER = (0.113, -0.271, 0.0)
+
+
+def build_index(mesh):
+    return SpatialIndex(mesh["co"], mesh["edges"], mesh["loop_verts"], mesh["loop_start"], mesh["loop_total"])
+
+
+# ----------------------- 颜色 -----------------------
+
+def test_falloff_colors_match_reference():
+    reference = load_reference()
+    r = 1.7
+    # 包括各段的分界点和两端
+    d = np.concatenate((np.linspace(0, r, 1001), [0.25 * r, 0.5 * r, 0.75 * r]))
+    expected = np.array([reference.calculate_falloff(x, r) for x in d.tolist()])
+    np.testing.assert_allclose(calculate_falloff_array(d, r), expected, atol=1e-6)
+
+
+def test_falloff_colors_at_zero_radius():
+    """开始拖动时半径为 0：不能除以零，距离为 0 的元素取 t = 0 的颜色"""
+    with np.errstate(all='raise'):
+        colors = calculate_falloff_array(np.zeros(3), 0.0)
+    np.testing.assert_array_equal(colors, np.tile(np.float32([1, 0, 0, 1]), (3, 1)))
+
+
+# ----------------------- 绘制数据 -----------------------
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("radius", [0.05, 0.4, 3.0])
+def test_draw_data_matches_reference(mesh, mode, radius):
+    reference = load_reference()
+    from mathutils import Vector
+    coords, colors, bt = get_draw_data_np(build_index(mesh), CENTER, radius, mode)
+    ref_coords, ref_colors, ref_bt = reference.get_draw_data(reference_bmesh(mesh), Vector(CENTER), radius, mode)
+    assert bt == ref_bt
+    assert len(coords) == len(ref_coords)
+    # 每个点、边或三角形的顶点连同颜色作为一条记录比较，与输出顺序无关
+    width = {'VERT': 1, 'EDGE': 2, 'FACE': 3}[mode]
+    n = len(coords) // width
+    ref_coords = np.array([tuple(c) for c in ref_coords]).reshape(-1, 3)
+    np.testing.assert_allclose(
+        sorted_rows(coords.reshape(n, -1), colors.reshape(n, -1)),
+        sorted_rows(ref_coords.reshape(n, -1), np.asarray(ref_colors).reshape(n, -1)), atol=1e-5)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_radius_ring_matches_full_query(mesh, mode):
+    """半径先增后减，RadiusRing 的结果始终等于按当前半径整体计算的结果"""
+    index = build_index(mesh)
+    ring = RadiusRing(index, CENTER, mode, key=None)
+    width = {'VERT': 1, 'EDGE': 2, 'FACE': 3}[mode]
+    for radius in (0.1, 0.6, 0.3, 1.2, 0.05):
+        coords, colors, bt = ring.draw_data(radius)
+        full_coords, full_colors, full_bt = get_draw_data_np(index, CENTER, radius, mode)
+        assert bt == full_bt and len(coords) == len(full_coords)
+        n = len(coords) // width
+        np.testing.assert_allclose(sorted_rows(coords.reshape(n, -1), colors.reshape(n, -1)),
+                                   sorted_rows(full_coords.reshape(n, -1), full_colors.reshape(n, -1)), atol=1e-6)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_radius_ring_positions(mesh, mode):
+    """GPU 着色用的缓冲：与 draw_data 同样的坐标，键为元素到中心的最小距离，着色器据此裁掉半径外的元素"""
+    index = build_index(mesh)
+    ring = RadiusRing(index, CENTER, mode, key=None)
+    reach = 0.8
+    coords, keys, bt = ring.positions(reach)
+    draw_coords, _, draw_bt = ring.draw_data(reach)
+    assert bt == draw_bt
+    np.testing.assert_array_equal(coords, draw_coords)
+    assert keys.dtype == np.float32 and (keys <= reach + 1e-6).all()
+    # 同一元素的输出顶点共用一个键，且不大于其中任何一个顶点到中心的距离
+    width = {'VERT': 1, 'EDGE': 2, 'FACE': 3}[mode]
+    per_element = keys.reshape(-1, width)
+    assert (per_element == per_element[:, :1]).all()
+    d = np.sqrt(((coords.astype(np.float64) - CENTER) ** 2).sum(axis=1))
+    if mode != 'FACE':  # 面的键是原始顶点的距离，内缩后的三角形顶点离中心可能更远或更近
+        assert (keys <= d + 1e-6).all()
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_seed_modes_at_zero_radius(mesh, mode):
+    """最近点和表面距离模式在半径为 0 时只画种子本身，颜色有限"""
+    index = build_index(mesh)
+    seeds = np.array([5, 77, 300])
+    for draw_data in (get_draw_data_nearest, get_draw_data_geodesic):
+        with np.errstate(all='raise'):
+            coords, colors, bt = draw_data(index, seeds, 0.0, mode)
+        assert len(coords) and np.isfinite(colors).all()
+
+
+# ----------------------- 选择中心 -----------------------
+
+def test_selection_accumulator_follows_selection():
+    rng = np.random.default_rng(3)
+    co = rng.random((5000, 3)).astype(np.float32)
+    mask = rng.random(len(co)) < 0.2
+    acc = SelectionAccumulator()
+    assert acc.update(co, np.flatnonzero(mask), key=0) is False
+    for key in range(1, 20):
+        mask[rng.integers(0, len(co), 40)] ^= True
+        selected = np.flatnonzero(mask)
+        assert acc.update(co, selected, key=key) is True
+        center, max_d = selection_center(co, selected)
+        np.testing.assert_allclose(acc.center, center, atol=1e-9)
+        assert acc.max_distance(center) == pytest.approx(max_d)
+
+    # 坐标数组换了就整体重算
+    assert acc.update(co.copy(), np.flatnonzero(mask), key=99) is False
+    matrix = np.diag([2.0, 2.0, 2.0, 1.0])
+    matrix[:3, 3] = (1, -2, 3)
+    world = transform_points(co[mask], matrix)
+    assert acc.max_distance(world.mean(axis=0), matrix) == pytest.approx(selection_center(world)[1])
+
+    assert acc.update(acc.co, np.empty(0, dtype=np.int64), key=100) and acc.center is None
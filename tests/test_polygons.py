@@ -0,0 +1,67 @@
+import numpy as np
+
+from geometry.display import face_draw_arrays
+from geometry.polygons import face_loop_verts, face_triangles, fan_triangles, inset_loops
+from geometry.spatial_index import SpatialIndex
+
+
+def faces_of(mesh):
+    lv = mesh["loop_verts"].tolist()
+    return [lv[s:s + t] for s, t in zip(mesh["loop_start"].tolist(), mesh["loop_total"].tolist())]
+
+
+def test_inset_loops(mesh):
+    loop_co = mesh["co"][mesh["loop_verts"]].astype(np.float64)
+    moved = inset_loops(loop_co, mesh["loop_start"], mesh["loop_total"], 0.05)
+    for s, t in zip(mesh["loop_start"].tolist(), mesh["loop_total"].tolist()):
+        face = loop_co[s:s + t]
+        center = face.mean(axis=0)
+        np.testing.assert_allclose(moved[s:s + t], face + (center - face) * 0.05, atol=1e-12)
+    assert inset_loops(loop_co.astype(np.float32), mesh["loop_start"], mesh["loop_total"]).dtype == np.float32
+
+
+def test_fan_triangles(mesh):
+    tris = fan_triangles(mesh["loop_start"], mesh["loop_total"])
+    expected = [(s, s + i + 1, s + i + 2)
+                for s, t in zip(mesh["loop_start"].tolist(), mesh["loop_total"].tolist()) for i in range(t - 2)]
+    np.testing.assert_array_equal(tris, expected)
+
+
+def test_face_triangles_gathers_cached_triangles(mesh):
+    """缓存的三角形按面收集，并换算成 face_loop_verts 紧凑排列中的环索引"""
+    loop_start, loop_total = mesh["loop_start"], mesh["loop_total"]
+    # 从每个面最后一个环开始的扇形，与默认的扇形不同
+    tris = fan_triangles(loop_start, loop_total)
+    last = np.repeat(loop_start + loop_total - 1, loop_total - 2)
+    cached = np.stack((last, tris[:, 1] - 1, tris[:, 2] - 1), axis=1)
+    index = SpatialIndex(mesh["co"], mesh["edges"], mesh["loop_verts"], loop_start, loop_total)
+    # 三角、四边和五边形各取几个
+    faces = np.concatenate([np.flatnonzero(loop_total == n)[:3] for n in (3, 4, 5)])
+
+    np.testing.assert_array_equal(face_triangles(index, faces, face_loop_verts(index, faces)[1]),
+                                  fan_triangles(face_loop_verts(index, faces)[1], loop_total[faces]))
+
+    index.set_topology(mesh["edges"], mesh["loop_verts"], loop_start, loop_total, cached)
+    loop_verts, compact_start, _ = face_loop_verts(index, faces)
+    got = loop_verts[face_triangles(index, faces, compact_start)]
+    tri_total = loop_total - 2
+    tri_start = np.cumsum(tri_total) - tri_total
+    face_tris = np.concatenate([np.arange(s, s + t) for s, t in zip(tri_start[faces], tri_total[faces])])
+    np.testing.assert_array_equal(got, mesh["loop_verts"][cached[face_tris]])
+
+
+def test_face_draw_arrays(mesh):
+    loop_tris = fan_triangles(mesh["loop_start"], mesh["loop_total"])
+    wire, wire_colors, fill, fill_colors = face_draw_arrays(
+        mesh["co"], mesh["loop_verts"], mesh["loop_start"], mesh["loop_total"], loop_tris)
+    expected_wire, expected_fill = [], []
+    for face in faces_of(mesh):
+        pts = mesh["co"][face]
+        scaled = pts.mean(axis=0) + (pts - pts.mean(axis=0)) * 0.9
+        for i in range(len(face)):
+            expected_wire += [scaled[i], scaled[(i + 1) % len(face)]]
+        for i in range(len(face) - 2):
+            expected_fill += [scaled[0], scaled[i + 1], scaled[i + 2]]
+    np.testing.assert_allclose(wire, expected_wire, atol=1e-6)
+    np.testing.assert_allclose(fill, expected_fill, atol=1e-6)
+    assert len(wire_colors) == len(wire) and len(fill_colors) == len(fill)
@@ -0,0 +1,114 @@
+import heapq
+
+import numpy as np
+import pytest
+
+from conftest import mixed_mesh
+from geometry.spatial_index import PointTree, SpatialIndex
+
+
+def brute_query(co, center, radius, inner=-1.0):
+    d = np.sqrt(((co.astype(np.float64) - center) ** 2).sum(axis=1))
+    inside = (d <= radius) & (d > inner)
+    return np.flatnonzero(inside), d[inside]
+
+
+def assert_same_hits(result, expected):
+    verts, dist = result
+    order = np.argsort(verts)
+    np.testing.assert_array_equal(verts[order], expected[0])
+    np.testing.assert_allclose(dist[order], expected[1], rtol=1e-6)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(1)
+    # 大部分点在单位立方体中，少数离群点把包围盒拉大
+    return np.concatenate((rng.random((4000, 3)), rng.normal(0, 4, (20, 3)))).astype(np.float32)
+
+
+@pytest.mark.parametrize("radius", [0.01, 0.1, 0.35, 10.0])
+def test_query_matches_brute_force(points, radius):
+    index = SpatialIndex(points)
+    for center in ((0.5, 0.5, 0.5), (0.0, 1.0, 0.2), (3.0, -2.0, 0.0)):
+        assert_same_hits(index.query(center, radius), brute_query(points, center, radius))
+
+
+def test_query_shell(points):
+    index = SpatialIndex(points)
+    center = (0.4, 0.6, 0.5)
+    for inner, outer in ((0.0, 0.2), (0.2, 0.3), (0.3, 0.9)):
+        assert_same_hits(index.query(center, outer, inner=inner), brute_query(points, center, outer, inner))
+
+
+def test_query_after_update(points):
+    rng = np.random.default_rng(2)
+    index = SpatialIndex(points)
+    co = points.copy()
+    for step in range(5):
+        moved = rng.choice(len(co), 60, replace=False)
+        co[moved[:50]] += rng.normal(0, 0.01, (50, 3)).astype(np.float32)  # 多数留在原格子附近
+        co[moved[50:]] = rng.random((10, 3)).astype(np.float32)  # 少数跳到别处
+        np.testing.assert_array_equal(np.sort(index.update(co)), np.sort(moved))
+        for center in ((0.5, 0.5, 0.5), tuple(co[moved[-1]])):
+            assert_same_hits(index.query(center, 0.15), brute_query(co, center, 0.15))
+
+
+def test_near_points_matches_brute_force(points):
+    index = SpatialIndex(points)
+    seeds = points[[3, 500, 1234, 3999]]
+    for radius in (0.05, 0.2):
+        verts, dist = index.near_points(seeds, radius)
+        d = np.sqrt(((points[:, None, :].astype(np.float64) - seeds[None]) ** 2).sum(axis=2)).min(axis=1)
+        expected = np.flatnonzero(d <= radius)
+        np.testing.assert_array_equal(verts, expected)
+        np.testing.assert_allclose(dist, d[expected], rtol=1e-6)
+
+
+@pytest.mark.parametrize("max_pairs", [PointTree.MAX_PAIRS, 64])
+def test_point_tree_matches_brute_force(points, monkeypatch, max_pairs):
+    """密集的一片种子和稀疏的零散种子；max_pairs 很小时分块路径也要给出相同结果"""
+    monkeypatch.setattr(PointTree, "MAX_PAIRS", max_pairs)
+    rng = np.random.default_rng(4)
+    dense = points[np.argsort(((points - points[0]) ** 2).sum(axis=1))[:1500]]
+    for seeds in (dense, rng.random((5, 3)), points[:1]):
+        tree = PointTree(seeds)
+        d = np.sqrt(((points[:, None, :].astype(np.float64) - seeds[None]) ** 2).sum(axis=2)).min(axis=1)
+        for radius in (0.05, 0.3, 100.0):
+            expected = np.where(d <= radius, d, np.inf)
+            np.testing.assert_allclose(tree.nearest(points, radius), expected, rtol=1e-6)
+    assert len(PointTree(np.empty((0, 3))).nearest(points, 1.0)) == len(points)
+
+
+def dijkstra(co, edges, seeds, bound):
+    neighbours = [[] for _ in range(len(co))]
+    for a, b in edges.tolist():
+        w = float(np.linalg.norm(co[a].astype(np.float64) - co[b]))
+        neighbours[a].append((b, w))
+        neighbours[b].append((a, w))
+    dist = {int(s): 0.0 for s in seeds}
+    heap = [(0.0, int(s)) for s in seeds]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist.get(v, np.inf):
+            continue
+        for u, w in neighbours[v]:
+            nd = d + w
+            if nd <= bound and nd < dist.get(u, np.inf):
+                dist[u] = nd
+                heapq.heappush(heap, (nd, u))
+    verts = np.array(sorted(dist), dtype=np.int64)
+    return verts, np.array([dist[v] for v in verts.tolist()])
+
+
+def test_geodesic_matches_dijkstra():
+    mesh = mixed_mesh(20)
+    index = SpatialIndex(mesh["co"], mesh["edges"])
+    seeds = np.array([0, 210, 399])
+    for bound in (0.1, 0.5, 5.0):
+        verts, dist = index.geodesic(seeds, bound)
+        expected_verts, expected_dist = dijkstra(mesh["co"], mesh["edges"], seeds, bound)
+        np.testing.assert_array_equal(verts, expected_verts)
+        np.testing.assert_allclose(dist, expected_dist, rtol=1e-6)
+    # 距离缓冲在调用之间复用，第二次查询不受第一次影响
+    np.testing.assert_array_equal(index.geodesic(seeds[:1], 0.2)[0], dijkstra(mesh["co"], mesh["edges"], seeds[:1], 0.2)[0])